@@ -0,0 +1,41 @@
+import sys
+
+from data.ohlcv_store import OHLCVStore
+from data.tiingo_data_fetcher import DataFetcher
+from data.utils.data_preprocessing import preprocess_data
+from train import model_selection_input, select_data
+from utils.common import print_colored
+from utils.walk_forward import WalkForwardValidator
+
+
+def main():
+    fetcher = DataFetcher(store=OHLCVStore())
+
+    # Select data dynamically based on user input
+    data = select_data(fetcher)
+    if data is None or data.empty:
+        print_colored("No data was loaded, nothing to backtest.", "error")
+        sys.exit(1)
+
+    # Normalize and preprocess the data
+    data = preprocess_data(data)
+
+    # Select models to backtest
+    model_types = model_selection_input()
+
+    n_folds = int(input("Enter the number of folds (default: 5): ").strip() or 5)
+    window = input("Enter the rolling training window in rows (optional): ").strip()
+    validator = WalkForwardValidator(
+        n_folds=n_folds, window=int(window) if window else None
+    )
+
+    results = validator.run(data, model_types)
+    print(results.to_string(index=False))
+    print(validator.summary(results).to_string())
+    print_colored(
+        f"Backtest complete in {results.attrs['elapsed_seconds']:.1f}s!", "success"
+    )
+
+
+if __name__ == "__main__":
+    main()
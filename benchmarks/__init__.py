@@ -0,0 +1,2 @@
+# only here to make this directory a package
+# so that we can import from it with the dot notation or stop pylint from complaining about it.
@@ -0,0 +1,49 @@
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.common import print_table, run_isolated, synthetic_ohlcv
+from data.series_cache import read_ohlcv_file, write_ohlcv_file
+
+
+def load_csv_cache(filename):
+    """Load a cache file the way the legacy CSV cache did."""
+    return pd.read_csv(filename)
+
+
+def load_columnar_cache(filename):
+    """Load a cache file through the fetcher's typed columnar cache."""
+    return read_ohlcv_file(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare load time and memory of the CSV and Parquet caches."
+    )
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    data = synthetic_ohlcv(args.rows)
+    with tempfile.TemporaryDirectory() as cache_folder:
+        csv_file = os.path.join(cache_folder, "btcusd_bench_1min.csv")
+        parquet_file = os.path.join(cache_folder, "btcusd_bench_1min.parquet")
+        data.to_csv(csv_file, index=False)
+        write_ohlcv_file(data, parquet_file)
+
+        rows = []
+        for name, loader, filename in [
+            ("csv", load_csv_cache, csv_file),
+            ("parquet", load_columnar_cache, parquet_file),
+        ]:
+            seconds, rss_mb = run_isolated(loader, filename)
+            size_mb = os.path.getsize(filename) / (1024 * 1024)
+            rows.append([name, f"{size_mb:.1f}", f"{seconds:.3f}", f"{rss_mb:.1f}"])
+
+    print(f"Loading {args.rows} rows of 1min OHLCV data:")
+    print_table(["format", "size (MB)", "load (s)", "peak RSS (MB)"], rows)
+
+
+if __name__ == "__main__":
+    main()
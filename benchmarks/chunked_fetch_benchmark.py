@@ -0,0 +1,60 @@
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.common import print_table
+from data.tiingo_data_fetcher import DataFetcher, RequestScheduler
+from data.utils.tiingo_replay_server import TiingoReplayServer
+
+
+def fetch(base_url, start_date, end_date, **fetcher_kwargs):
+    """Fetch a fresh range into an empty cache and return (seconds, rows)."""
+    with tempfile.TemporaryDirectory() as cache_folder:
+        fetcher = DataFetcher(
+            cache_folder=cache_folder,
+            base_url=base_url,
+            # The stand-in server has no request caps
+            scheduler=RequestScheduler(),
+            **fetcher_kwargs,
+        )
+        start = time.perf_counter()
+        df = fetcher.fetch_tiingo_crypto_data("btcusd", start_date, end_date, "1min")
+        return time.perf_counter() - start, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare single-request and chunked parallel crypto fetching."
+    )
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--bar_latency", type=float, default=2e-5)
+    args = parser.parse_args()
+
+    server = TiingoReplayServer(latency=args.latency, bar_latency=args.bar_latency)
+    server.start()
+    base_url = server.base_url
+
+    start_date = "2023-01-01"
+    end_date = (pd.Timestamp(start_date) + pd.Timedelta(days=args.days - 1)).strftime(
+        "%Y-%m-%d"
+    )
+    rows = []
+    for name, kwargs in [
+        ("single request", {"chunk_bars": None, "max_workers": 1, "timeout": 600}),
+        ("chunked, 1 worker", {"max_workers": 1}),
+        ("chunked, 4 workers", {"max_workers": 4}),
+        ("chunked, 8 workers", {"max_workers": 8}),
+    ]:
+        seconds, fetched_rows = fetch(base_url, start_date, end_date, **kwargs)
+        rows.append([name, fetched_rows, f"{seconds:.2f}"])
+    server.stop()
+
+    print(f"Fetching {args.days} days of 1min bars from a local stand-in server:")
+    print_table(["mode", "rows", "seconds"], rows)
+
+
+if __name__ == "__main__":
+    main()
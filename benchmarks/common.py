@@ -0,0 +1,64 @@
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from data.utils.tiingo_replay_server import (  # pylint: disable=unused-import
+    synthetic_ohlcv,
+)
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB."""
+    # VmHWM is tracked per address space, so unlike ru_maxrss it is not inherited
+    # from the parent of a spawned process
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status", "r", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def timed(fn, *args, repeat=1, **kwargs):
+    """Run fn repeat times and return (best wall-clock seconds, last result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _isolated_worker(queue, fn, args):
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    fn(*args)
+    queue.put((time.perf_counter() - start, peak_rss_mb() - baseline))
+
+
+def run_isolated(fn, *args):
+    """
+    Run fn in a fresh process so its peak memory is not polluted by earlier runs.
+
+    :return: Tuple of (wall-clock seconds, peak RSS growth in MB).
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_isolated_worker, args=(queue, fn, args))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def print_table(headers, rows):
+    """Print benchmark results as an aligned text table."""
+    widths = [
+        max(len(str(value)) for value in column) for column in zip(headers, *rows)
+    ]
+    for row in [headers] + rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
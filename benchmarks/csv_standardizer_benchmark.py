@@ -0,0 +1,76 @@
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.common import print_table, run_isolated, synthetic_ohlcv
+from data.utils.csv_standardizer import CSVStandardizer
+
+
+def write_vendor_file(path, rows):
+    """Write a semicolon-separated export with a BOM, like the CoinMarketCap files."""
+    data = synthetic_ohlcv(rows)
+    data.insert(0, "timeOpen", data["date"].dt.strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+    data.insert(1, "name", "2781")
+    data["marketCap"] = data["close"] * 1e8
+    data["date"] = data["timeOpen"]
+    data.to_csv(path, sep=";", index=False, encoding="utf-8-sig")
+
+
+def legacy_fix_csv(file_path, output_path):
+    """The previous in-memory implementation, kept here as the baseline."""
+    data = pd.read_csv(file_path, sep=";", engine="python")
+    data["date"] = pd.to_datetime(data["date"], errors="coerce")
+    data.columns = data.columns.str.strip()
+    data = data.dropna()
+    data.to_csv(output_path, index=False)
+
+
+def streaming_fix_csv(file_path, output_path, engine):
+    """Run the streaming standardizer."""
+    CSVStandardizer.fix_csv(file_path, output_path, date_column="date", engine=engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the in-memory and streaming CSV standardizers."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        source = os.path.join(folder, "vendor.csv")
+        write_vendor_file(source, args.rows)
+
+        rows = []
+        for name, fn, fn_args in [
+            ("legacy, python engine", legacy_fix_csv, (os.path.join(folder, "a.csv"),)),
+            (
+                "streaming c -> csv",
+                streaming_fix_csv,
+                (os.path.join(folder, "b.csv"), "c"),
+            ),
+            (
+                "streaming c -> parquet",
+                streaming_fix_csv,
+                (os.path.join(folder, "c.parquet"), "c"),
+            ),
+            (
+                "streaming pyarrow -> parquet",
+                streaming_fix_csv,
+                (os.path.join(folder, "d.parquet"), "pyarrow"),
+            ),
+        ]:
+            seconds, rss_mb = run_isolated(fn, source, *fn_args)
+            rows.append(
+                [name, f"{seconds:.2f}", f"{args.rows / seconds:,.0f}", f"{rss_mb:.0f}"]
+            )
+        size_mb = os.path.getsize(source) / (1024 * 1024)
+
+    print(f"Standardizing {args.rows} rows ({size_mb:.0f} MB):")
+    print_table(["mode", "seconds", "rows/sec", "peak RSS (MB)"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import tempfile
+import time
+
+from benchmarks.common import print_table
+from data.tiingo_data_fetcher import DataFetcher, RequestScheduler
+from data.utils.tiingo_replay_server import TiingoReplayServer
+
+
+def refresh(base_url, symbols, frequency, max_concurrency):
+    """Fetch all symbols into an empty cache and return (seconds, rows)."""
+    with tempfile.TemporaryDirectory() as cache_folder:
+        fetcher = DataFetcher(
+            cache_folder=cache_folder,
+            base_url=base_url,
+            # The stand-in server has no request caps
+            scheduler=RequestScheduler(),
+        )
+        start = time.perf_counter()
+        df = asyncio.run(
+            fetcher.fetch_many(
+                symbols,
+                "2024-01-01",
+                "2024-03-31",
+                frequency,
+                max_concurrency=max_concurrency,
+                long_format=True,
+            )
+        )
+        return time.perf_counter() - start, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how fetch_many scales with the concurrency limit."
+    )
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = TiingoReplayServer(latency=args.latency)
+    server.start()
+    rows = []
+    for asset_type, frequency in [("stock", "daily"), ("crypto", "1day")]:
+        symbols = [f"{asset_type[0]}{i:03d}" for i in range(args.symbols)]
+        for max_concurrency in [1, 5, 10, 25, 50]:
+            seconds, fetched_rows = refresh(
+                server.base_url, symbols, frequency, max_concurrency
+            )
+            rows.append([asset_type, max_concurrency, fetched_rows, f"{seconds:.2f}"])
+    server.stop()
+
+    print(
+        f"Refreshing {args.symbols} symbols with {args.latency}s of server latency per request:"
+    )
+    print_table(["asset type", "concurrency", "rows", "seconds"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.common import print_table
+from data.tiingo_data_fetcher import DataFetcher, RequestScheduler
+from data.utils.tiingo_replay_server import TiingoReplayServer
+
+
+def make_fetcher(cache_folder, base_url):
+    """A fetcher against the replay server, which has no request caps."""
+    return DataFetcher(
+        cache_folder=cache_folder,
+        base_url=base_url,
+        scheduler=RequestScheduler(),
+        backoff_factor=0.05,
+    )
+
+
+def stage_rows(name, rows, seconds):
+    """Format one result row of the benchmark table."""
+    return [name, rows, f"{seconds:.3f}", f"{rows / seconds:,.0f}"]
+
+
+def run_stages(base_url, symbol, start_date, end_date, frequency):
+    """Time the fetch, normalize and cache-write stages on their own."""
+    with tempfile.TemporaryDirectory() as cache_folder:
+        fetcher = make_fetcher(cache_folder, base_url)
+        params = {
+            "tickers": symbol,
+            "startDate": start_date,
+            "endDate": end_date,
+            "resampleFreq": frequency,
+        }
+
+        start = time.perf_counter()
+        data = fetcher._get_json(f"{base_url}/tiingo/crypto/prices", params)
+        fetch_seconds = time.perf_counter() - start
+        price_data = data[0]["priceData"]
+
+        start = time.perf_counter()
+        df = fetcher._normalize_tiingo_data(price_data, symbol)
+        normalize_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fetcher.cache.merge(symbol, frequency, df, [(start_date, end_date)])
+        write_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached = fetcher.cache.read(symbol, frequency, start_date, end_date)
+        read_seconds = time.perf_counter() - start
+
+    rows = len(price_data)
+    return [
+        stage_rows("fetch (HTTP + JSON)", rows, fetch_seconds),
+        stage_rows("normalize", len(df), normalize_seconds),
+        stage_rows("cache write", len(df), write_seconds),
+        stage_rows("cache read", len(cached), read_seconds),
+    ]
+
+
+def run_end_to_end(name, server, symbol, start_date, end_date, frequency):
+    """Time a cold-cache fetch through the whole pipeline."""
+    with tempfile.TemporaryDirectory() as cache_folder:
+        fetcher = make_fetcher(cache_folder, server.base_url)
+        start = time.perf_counter()
+        df = fetcher.fetch_tiingo_crypto_data(symbol, start_date, end_date, frequency)
+        return stage_rows(name, len(df), time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure rows/sec of the fetch pipeline against the Tiingo replay server."
+    )
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--frequency", default="1min")
+    parser.add_argument("--error_rate", type=float, default=0.2)
+    parser.add_argument("--requests_per_second", type=float, default=10)
+    args = parser.parse_args()
+
+    symbol, start_date = "btcusd", "2024-01-01"
+    end_date = (pd.Timestamp(start_date) + pd.Timedelta(days=args.days - 1)).strftime(
+        "%Y-%m-%d"
+    )
+
+    with TiingoReplayServer() as server:
+        rows = run_stages(server.base_url, symbol, start_date, end_date, args.frequency)
+        rows.append(
+            run_end_to_end(
+                "end to end", server, symbol, start_date, end_date, args.frequency
+            )
+        )
+
+    with TiingoReplayServer(
+        error_rate=args.error_rate, requests_per_second=args.requests_per_second
+    ) as server:
+        rows.append(
+            run_end_to_end(
+                "end to end, errors + rate limit",
+                server,
+                symbol,
+                start_date,
+                end_date,
+                args.frequency,
+            )
+        )
+        stats = server.stats
+
+    print(f"Fetch pipeline for {args.days} days of {args.frequency} bars:")
+    print_table(["stage", "rows", "seconds", "rows/sec"], rows)
+    print(
+        f"Replay server with injected failures: {stats['requests']} requests, "
+        f"{stats['errors']} errors, {stats['rate_limited']} rate limited"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import warnings
+
+import pandas as pd
+
+from benchmarks.common import print_table, run_isolated, synthetic_ohlcv
+from utils.model_commons import create_lag_features, create_lag_matrix
+
+FEATURE_COLUMNS = ["open", "high", "low", "volume"]
+
+
+def build_with_frame(rows, n_lags):
+    """Build the feature matrix the way the lag-based models used to."""
+    # Each inserted lag column fragments the frame, which pandas warns about
+    warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+    data = synthetic_ohlcv(rows)
+    data_with_lags = create_lag_features(data, "close", n_lags)
+    return data_with_lags[
+        FEATURE_COLUMNS + [f"lag_{i}" for i in range(1, n_lags + 1)]
+    ].values
+
+
+def build_with_matrix(rows, n_lags):
+    """Build the feature matrix from strided views of the target."""
+    data = synthetic_ohlcv(rows)
+    return create_lag_matrix(data, "close", n_lags)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare create_lag_features with the strided lag-matrix builder."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lags", type=int, nargs="+", default=[5, 50, 200])
+    args = parser.parse_args()
+
+    # Memory of the synthetic input, measured separately so it can be subtracted
+    _, input_mb = run_isolated(synthetic_ohlcv, args.rows)
+
+    rows = []
+    for n_lags in args.lags:
+        for name, builder in [
+            ("create_lag_features", build_with_frame),
+            ("create_lag_matrix", build_with_matrix),
+        ]:
+            seconds, rss_mb = run_isolated(builder, args.rows, n_lags)
+            rows.append(
+                [name, n_lags, f"{seconds:.2f}", f"{max(rss_mb - input_mb, 0):.0f}"]
+            )
+
+    print(f"Building lag features for {args.rows} rows:")
+    print_table(["builder", "lags", "seconds", "peak RSS (MB)"], rows)
+
+
+if __name__ == "__main__":
+    main()
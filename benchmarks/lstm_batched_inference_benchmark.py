@@ -0,0 +1,64 @@
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare recursive and batched teacher-forced LSTM inference."
+    )
+    parser.add_argument("--windows", type=int, default=100_000)
+    parser.add_argument(
+        "--chunk-sizes", type=int, nargs="+", default=[256, 1024, 4096, 16384]
+    )
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    config = LstmConfig()
+    config.interval = "1min"
+    model = LstmModel(config=config)
+    data = synthetic_ohlcv(args.windows + config.time_steps)
+
+    rows = []
+    start = time.perf_counter()
+    model.inference(data)
+    rows.append(["recursive loop", "-", f"{time.perf_counter() - start:.2f}"])
+
+    batched = None
+    for chunk_size in args.chunk_sizes:
+        start = time.perf_counter()
+        batched = model.inference(data, teacher_forcing=True, chunk_size=chunk_size)
+        rows.append(
+            ["teacher-forced", chunk_size, f"{time.perf_counter() - start:.2f}"]
+        )
+
+    # The batched predictions equal predicting each window on its own
+    closes = data["close"].to_numpy(dtype=np.float64)
+    scaled = (closes - closes.min()) / (closes.max() - closes.min())
+    positions = np.linspace(config.time_steps, len(data) - 1, 20).astype(int)
+    with torch.no_grad():
+        single = [
+            model.model(
+                torch.tensor(
+                    scaled[t - config.time_steps : t], dtype=torch.float32
+                ).view(1, -1, 1)
+            )[0].item()
+            * (closes.max() - closes.min())
+            + closes.min()
+            for t in positions
+        ]
+    deviation = np.abs(batched["prediction"].to_numpy()[positions] - single).max()
+
+    print(f"Inference over {args.windows} windows of {config.time_steps} steps:")
+    print_table(["mode", "chunk size", "seconds"], rows)
+    print(f"Max deviation from predicting windows one at a time: {deviation:.2e}")
+
+
+if __name__ == "__main__":
+    main()
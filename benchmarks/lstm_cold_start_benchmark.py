@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import torch
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+
+# Loads the state_dict through LstmModel and predicts, timing each phase
+STATE_DICT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import pandas as pd
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+config = LstmConfig()
+config.interval = "1h"
+model = LstmModel(config=config)
+model.save_dir = sys.argv[1]
+model.load()
+loaded = time.perf_counter()
+data = pd.read_parquet(sys.argv[2])
+read = time.perf_counter()
+model.forecast(1, data)
+done = time.perf_counter()
+print(json.dumps([loaded - start, done - read]))
+"""
+
+# Loads the TorchScript export through the runtime loader and predicts
+EXPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from models.lstm.runtime import ExportedLstm
+model = ExportedLstm(sys.argv[1] + "/lstm")
+loaded = time.perf_counter()
+closes = json.load(open(sys.argv[3]))
+read = time.perf_counter()
+model.predict(closes)
+done = time.perf_counter()
+print(json.dumps([loaded - start, done - read]))
+"""
+
+
+def run(script, *args):
+    """Run a script in a fresh interpreter and return its (load, predict) seconds."""
+    output = subprocess.run(
+        [sys.executable, "-c", script, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare cold starts of the state_dict and TorchScript LSTM."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        config = LstmConfig()
+        config.interval = "1h"
+        model = LstmModel(config=config)
+        model.save_dir = folder
+        model.save()
+        model.export()
+
+        # The state_dict path resamples raw bars, the export takes interval closes
+        data = synthetic_ohlcv(60 * config.time_steps)
+        data_path = os.path.join(folder, "data.parquet")
+        data.to_parquet(data_path)
+        closes_path = os.path.join(folder, "closes.json")
+        with open(closes_path, "w", encoding="utf-8") as file:
+            json.dump(data["close"].iloc[59::60].tolist(), file)
+
+        rows = []
+        for name, script in [
+            ("state_dict", STATE_DICT_SCRIPT),
+            ("TorchScript", EXPORT_SCRIPT),
+        ]:
+            timings = [
+                run(script, folder, data_path, closes_path) for _ in range(args.repeat)
+            ]
+            rows.append(
+                [
+                    name,
+                    f"{min(load for load, _ in timings) * 1e3:.0f}",
+                    f"{min(predict for _, predict in timings) * 1e3:.1f}",
+                ]
+            )
+
+    print(
+        f"LSTM cold start (best of {args.repeat} fresh processes, torch {torch.__version__}):"
+    )
+    print_table(["artifact", "import + load (ms)", "first prediction (ms)"], rows)
+
+
+if __name__ == "__main__":
+    main()
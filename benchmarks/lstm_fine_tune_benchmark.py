@@ -0,0 +1,98 @@
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+from utils.ohlcv_pyramid import get_pyramid
+
+
+def held_out_mae(model, hourly, start, time_steps):
+    """Teacher-forced MAE of the model on the hours from start on."""
+    held_out = hourly.iloc[start - time_steps :].reset_index()
+    actual = held_out["close"].to_numpy()[time_steps:]
+    predicted = model.inference(held_out, teacher_forcing=True)[
+        "prediction"
+    ].to_numpy()[time_steps:]
+    return float(np.mean(np.abs(predicted - actual)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare a full LSTM retrain with a warm-start fine-tune on new data."
+    )
+    parser.add_argument("--hours", type=int, default=20_000)
+    parser.add_argument("--new-hours", type=int, default=24)
+    parser.add_argument("--test-hours", type=int, default=500)
+    parser.add_argument("--epochs", type=int, default=20)
+    args = parser.parse_args()
+
+    config = LstmConfig()
+    config.interval = "1h"
+    config.epochs = args.epochs
+    config.early_stopping_patience = args.epochs
+
+    hourly = get_pyramid(synthetic_ohlcv(args.hours * 60)).resample("1h")
+    test_start = len(hourly) - args.test_hours
+    old = hourly.iloc[: test_start - args.new_hours].reset_index()
+    new = hourly.iloc[:test_start].reset_index()
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        # Yesterday's model, trained before the new hours arrived
+        torch.manual_seed(0)
+        base = LstmModel(config=config)
+        base.save_dir = save_dir
+        base.train(old)
+
+        rows = [
+            [
+                "previous model",
+                "-",
+                "-",
+                f"{held_out_mae(base, hourly, test_start, config.time_steps):.4f}",
+            ]
+        ]
+
+        torch.manual_seed(1)
+        retrained = LstmModel(model_name="lstm_retrained", config=config)
+        retrained.save_dir = save_dir
+        start = time.perf_counter()
+        retrained.train(new)
+        seconds = time.perf_counter() - start
+        rows.append(
+            [
+                "full retrain",
+                len(retrained.training_history),
+                f"{seconds:.1f}",
+                f"{held_out_mae(retrained, hourly, test_start, config.time_steps):.4f}",
+            ]
+        )
+
+        torch.manual_seed(1)
+        fine_tuned = LstmModel(config=config)
+        fine_tuned.save_dir = save_dir
+        start = time.perf_counter()
+        fine_tuned.fine_tune(new)
+        seconds = time.perf_counter() - start
+        rows.append(
+            [
+                "fine-tune",
+                len(fine_tuned.training_history),
+                f"{seconds:.1f}",
+                f"{held_out_mae(fine_tuned, hourly, test_start, config.time_steps):.4f}",
+            ]
+        )
+
+    print(
+        f"Training on {len(new)} hours, {args.new_hours} of them new, "
+        f"scored on the next {args.test_hours} hours (teacher-forced):"
+    )
+    print_table(["model", "epochs", "seconds", "held-out MAE"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import time
+
+import torch
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+
+
+def forecast_seconds(model, steps, data, repeat):
+    """Best wall-clock seconds of a forecast over repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.forecast(steps, data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare recursive and multi-horizon LSTM forecasts."
+    )
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    data = synthetic_ohlcv(1440 * 400)
+
+    rows = []
+    for name, horizon in [("recursive", 1), ("multi-horizon head", args.steps)]:
+        config = LstmConfig()
+        config.output_size = horizon
+        model = LstmModel(config=config)
+        # Warm up the pyramid of the data and the model
+        model.forecast(args.steps, data)
+        seconds = forecast_seconds(model, args.steps, data, args.repeat)
+        rows.append([name, horizon, f"{seconds * 1e3:.1f}"])
+
+    print(f"{args.steps}-day forecast latency:")
+    print_table(["mode", "output size", "ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
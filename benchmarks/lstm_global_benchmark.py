@@ -0,0 +1,91 @@
+import argparse
+import tempfile
+import time
+
+import torch
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+
+
+def make_config(epochs, batch_size):
+    config = LstmConfig()
+    config.interval = "1h"
+    config.epochs = epochs
+    config.early_stopping_patience = epochs
+    config.batch_size = batch_size
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare per-symbol LSTM models with one global multi-symbol model."
+    )
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--hours", type=int, default=1_000)
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 256])
+    parser.add_argument("--steps", type=int, default=30)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    data = {
+        f"SYM{i}": synthetic_ohlcv(args.hours, freq="1h", seed=i)
+        for i in range(args.symbols)
+    }
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        rows = []
+        config = make_config(args.epochs, args.batch_sizes[0])
+        start = time.perf_counter()
+        for symbol, symbol_data in data.items():
+            model = LstmModel(model_name=f"lstm_{symbol}", config=config)
+            model.save_dir = save_dir
+            model.train(symbol_data)
+        rows.append(
+            [
+                f"{args.symbols} separate models",
+                args.batch_sizes[0],
+                f"{time.perf_counter() - start:.1f}",
+            ]
+        )
+
+        global_model = None
+        for batch_size in args.batch_sizes:
+            global_model = LstmModel(
+                model_name="lstm_global", config=make_config(args.epochs, batch_size)
+            )
+            global_model.save_dir = save_dir
+            start = time.perf_counter()
+            global_model.train_many(data)
+            rows.append(
+                ["one global model", batch_size, f"{time.perf_counter() - start:.1f}"]
+            )
+
+    print(
+        f"Training on {args.symbols} symbols of {args.hours} hours "
+        f"for {args.epochs} epochs:"
+    )
+    print_table(["training", "batch size", "seconds"], rows)
+
+    start = time.perf_counter()
+    for symbol, symbol_data in data.items():
+        global_model.forecast(args.steps, symbol_data)
+    looped = time.perf_counter() - start
+    start = time.perf_counter()
+    global_model.forecast_many(args.steps, data)
+    batched = time.perf_counter() - start
+
+    print(f"\n{args.steps}-step forecasts of all {args.symbols} symbols:")
+    print_table(
+        ["forecast", "seconds"],
+        [
+            ["forecast() per symbol", f"{looped:.2f}"],
+            ["forecast_many()", f"{batched:.2f}"],
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import time
+
+import torch
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+from models.lstm.utils import mc_dropout
+
+
+def sequential_samples(model, window, steps, samples):
+    """Draw each dropout sample with its own forecast passes."""
+    with mc_dropout(model.model):
+        return torch.cat(
+            [
+                model._forecast_scaled(  # pylint: disable=protected-access
+                    model.model, window, steps
+                )
+                for _ in range(samples)
+            ]
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare sequential and batched Monte-Carlo dropout forecasts."
+    )
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--samples", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--output-size", type=int, default=1)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    config = LstmConfig()
+    config.output_size = args.output_size
+    model = LstmModel(config=config)
+    data = synthetic_ohlcv(1440 * 400)
+    model.forecast(args.steps, data)
+    window = torch.rand(1, config.time_steps, 1)
+
+    rows = []
+    for samples in args.samples:
+        start = time.perf_counter()
+        sequential_samples(model, window, args.steps, samples)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bands = model.forecast(
+            args.steps, data, quantiles=(0.05, 0.5, 0.95), samples=samples
+        )
+        batched = time.perf_counter() - start
+        rows.append(
+            [
+                samples,
+                f"{sequential * 1e3:.0f}",
+                f"{batched * 1e3:.0f}",
+                f"{sequential / batched:.1f}x",
+            ]
+        )
+
+    print(
+        f"{args.steps}-step forecasts with quantile bands "
+        f"(output size {args.output_size}):"
+    )
+    print_table(["samples", "sequential (ms)", "batched (ms)", "speedup"], rows)
+    print(bands.tail(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
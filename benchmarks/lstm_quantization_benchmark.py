@@ -0,0 +1,110 @@
+import argparse
+import io
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+from utils.ohlcv_pyramid import get_pyramid
+
+
+def windows_per_second(model, batch_size, time_steps, repeat):
+    """Throughput of one module on random windows of one batch size."""
+    inputs = torch.rand(batch_size, time_steps, 1)
+    with torch.inference_mode():
+        model(inputs)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            model(inputs)
+    return batch_size * repeat / (time.perf_counter() - start)
+
+
+def serialized_mb(model):
+    """Size of the module's state_dict as saved by torch.save."""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare fp32 and int8 dynamically quantized LSTM inference."
+    )
+    parser.add_argument("--hours", type=int, default=5_000)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    config = LstmConfig()
+    config.interval = "1h"
+    config.epochs = args.epochs
+    model = LstmModel(config=config)
+
+    # Train on the first 80% of the hours and hold out the rest
+    hourly = get_pyramid(synthetic_ohlcv(args.hours * 60)).resample("1h")
+    split = int(len(hourly) * 0.8)
+    with tempfile.TemporaryDirectory() as save_dir:
+        model.save_dir = save_dir
+        model.train(hourly.iloc[:split].reset_index())
+    held_out = hourly.iloc[split - config.time_steps :].reset_index()
+    actual = held_out["close"].to_numpy()[config.time_steps :]
+
+    predictions = {}
+    modules = {}
+    for quantize in (False, True):
+        model.config.quantize = quantize
+        name = "int8" if quantize else "fp32"
+        predictions[name] = model.inference(held_out, teacher_forcing=True)[
+            "prediction"
+        ].to_numpy()[config.time_steps :]
+        modules[name] = model._inference_model()  # pylint: disable=protected-access
+
+    delta = np.abs(predictions["int8"] - predictions["fp32"])
+    print(f"Accuracy on {len(actual)} held-out hours (teacher-forced):")
+    print_table(
+        ["model", "MAE", "RMSE", "size (MB)"],
+        [
+            [
+                name,
+                f"{np.mean(np.abs(predicted - actual)):.4f}",
+                f"{np.sqrt(np.mean((predicted - actual) ** 2)):.4f}",
+                f"{serialized_mb(modules[name]):.3f}",
+            ]
+            for name, predicted in predictions.items()
+        ],
+    )
+    print(
+        f"int8 vs fp32 predictions: mean |delta| {delta.mean():.4f}, "
+        f"max |delta| {delta.max():.4f}, "
+        f"mean relative {np.mean(delta / np.abs(predictions['fp32'])):.2e}"
+    )
+
+    rows = []
+    for batch_size in args.batch_sizes:
+        rates = {
+            name: windows_per_second(module, batch_size, config.time_steps, args.repeat)
+            for name, module in modules.items()
+        }
+        rows.append(
+            [
+                batch_size,
+                f"{rates['fp32']:.0f}",
+                f"{rates['int8']:.0f}",
+                f"{rates['int8'] / rates['fp32']:.2f}x",
+            ]
+        )
+    print(
+        f"\nThroughput in windows/s ({torch.get_num_threads()} threads, "
+        f"{torch.backends.quantized.engine} engine):"
+    )
+    print_table(["batch size", "fp32", "int8", "int8 speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+from utils.ohlcv_pyramid import get_pyramid
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare windowed and stateful per-bar LSTM inference."
+    )
+    parser.add_argument("--bars", type=int, default=2_000)
+    parser.add_argument("--epochs", type=int, default=3)
+    args = parser.parse_args()
+
+    config = LstmConfig()
+    config.interval = "1h"
+    config.epochs = args.epochs
+    model = LstmModel(config=config)
+
+    # Hourly bars: enough to train on, then args.bars bars to stream
+    warm_bars = 2_000
+    data = synthetic_ohlcv((warm_bars + args.bars) * 60)
+    hourly = get_pyramid(data).resample(config.interval)
+    with tempfile.TemporaryDirectory() as save_dir:
+        model.save_dir = save_dir
+        model.train(hourly.iloc[:warm_bars].reset_index())
+
+    history = hourly.iloc[:warm_bars].reset_index()
+    closes = hourly["close"].to_numpy(dtype=np.float64)
+    model.warm_stream(history)
+    scale, offset = model.state_cache.scalers["default"]
+    scaled = torch.from_numpy((closes * scale + offset).astype(np.float32))
+    time_steps = config.time_steps
+
+    # Windowed: the last time_steps closes are run through the LSTM for every bar
+    windowed = []
+    start = time.perf_counter()
+    with torch.no_grad():
+        for t in range(warm_bars, warm_bars + args.bars):
+            window = scaled[t + 1 - time_steps : t + 1].view(1, -1, 1)
+            windowed.append((model.model(window)[0].item() - offset) / scale)
+    windowed_seconds = time.perf_counter() - start
+
+    # Stateful: only the new close is fed, from the cached (h, c) state
+    stateful = []
+    start = time.perf_counter()
+    for t in range(warm_bars, warm_bars + args.bars):
+        stateful.append(model.stream_inference(closes[t]))
+    stateful_seconds = time.perf_counter() - start
+
+    # Teacher-forced inference() predicts the same bars, but from a scaler fitted
+    # on all of its input rather than on the warm-up history
+    streamed = hourly.iloc[: warm_bars + args.bars].reset_index()
+    teacher_forced = model.inference(streamed, teacher_forcing=True)[
+        "prediction"
+    ].to_numpy()[warm_bars + 1 :]
+
+    # Deviations in the model's scaled units and in standard deviations of the
+    # hourly close changes, since relative to the price level they look tiny
+    sigma = np.std(np.diff(closes[warm_bars - 1 :]))
+    rows = []
+    for name, reference, predicted in [
+        ("windowed, same scaler", np.array(windowed), np.array(stateful)),
+        ("inference(), own scaler", teacher_forced, np.array(stateful[:-1])),
+    ]:
+        deviation = np.abs(predicted - reference)
+        rows.append(
+            [
+                name,
+                f"{deviation.max() * scale:.2e}",
+                f"{deviation.mean() * scale:.2e}",
+                f"{deviation.max() / sigma:.2e}",
+                f"{deviation.mean() / sigma:.2e}",
+            ]
+        )
+    print(f"Per-bar inference over {args.bars} hourly bars:")
+    print_table(
+        ["mode", "us per bar"],
+        [
+            ["windowed", f"{windowed_seconds / args.bars * 1e6:.0f}"],
+            ["stateful", f"{stateful_seconds / args.bars * 1e6:.0f}"],
+        ],
+    )
+    print(
+        "Deviation of the stateful predictions, scaled and in sigmas of close changes:"
+    )
+    print_table(
+        ["reference", "max scaled", "mean scaled", "max sigma", "mean sigma"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
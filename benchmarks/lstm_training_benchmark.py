@@ -0,0 +1,95 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from models.lstm.configs import LstmConfig
+from models.lstm.model import LstmModel
+
+
+# pylint: disable=too-many-arguments
+def train_epochs(rows, epochs, threads, interop_threads, compile_model, bf16):
+    """Train on a synthetic series and return the seconds of each epoch."""
+    config = LstmConfig()
+    config.interval = "1min"
+    config.epochs = epochs
+    config.early_stopping_patience = epochs
+    config.num_threads = threads
+    config.num_interop_threads = interop_threads
+    config.compile = compile_model
+    config.bf16 = bf16
+    model = LstmModel(config=config)
+    with tempfile.TemporaryDirectory() as save_dir:
+        model.save_dir = save_dir
+        model.train(synthetic_ohlcv(rows))
+    return [
+        (epoch["seconds"], epoch["samples_per_second"], epoch["val_loss"])
+        for epoch in model.training_history
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sweep the CPU training settings of the LSTM."
+    )
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument(
+        "--threads", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1})
+    )
+    parser.add_argument("--interop-threads", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    rows = []
+    # Every setting runs in a fresh process, since torch only accepts the
+    # inter-op thread count before any parallel work
+    context = multiprocessing.get_context("spawn")
+    for threads, interop_threads, compile_model, bf16 in itertools.product(
+        args.threads, args.interop_threads, [False, True], [False, True]
+    ):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            epochs = executor.submit(
+                train_epochs,
+                args.rows,
+                args.epochs,
+                threads,
+                interop_threads,
+                compile_model,
+                bf16,
+            ).result()
+        # The first epoch includes compilation, so steady state is measured after it
+        steady = epochs[1:] or epochs
+        rows.append(
+            [
+                threads,
+                interop_threads,
+                compile_model,
+                bf16,
+                f"{epochs[0][0]:.2f}",
+                f"{sum(seconds for seconds, _, _ in steady) / len(steady):.2f}",
+                f"{sum(rate for _, rate, _ in steady) / len(steady):.0f}",
+                f"{epochs[-1][2]:.5f}",
+            ]
+        )
+
+    print(f"LSTM training on {args.rows} one-minute bars, {args.epochs} epochs:")
+    print_table(
+        [
+            "threads",
+            "inter-op",
+            "compile",
+            "bf16",
+            "first epoch (s)",
+            "epoch (s)",
+            "samples/s",
+            "val loss",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
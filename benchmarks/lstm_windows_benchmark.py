@@ -0,0 +1,66 @@
+import argparse
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from benchmarks.common import print_table, run_isolated
+from models.lstm.utils import WindowBatcher, WindowDataset
+
+
+def batches_with_lists(rows, time_steps, batch_size):
+    """Build and batch the training windows the way LstmModel.train used to."""
+    series = np.random.default_rng(0).random((rows, 1))
+    windows = []
+    for i in range(time_steps, len(series)):
+        windows.append(series[i - time_steps : i, 0])
+    windows = np.array(windows)
+    x_train, y_train = windows[:-1], windows[1:]
+    x_train = torch.tensor(x_train, dtype=torch.float32).unsqueeze(-1)
+    y_train = torch.tensor(y_train[:, -1], dtype=torch.float32).unsqueeze(-1)
+    loader = DataLoader(
+        TensorDataset(x_train, y_train), batch_size=batch_size, shuffle=True
+    )
+    for _ in loader:
+        pass
+
+
+def batches_with_views(rows, time_steps, batch_size):
+    """Batch windows gathered from strided views of one tensor."""
+    series = np.random.default_rng(0).random((rows, 1))
+    dataset = WindowDataset(
+        torch.from_numpy(series.ravel().astype(np.float32)), time_steps
+    )
+    for _ in WindowBatcher(dataset, range(len(dataset)), batch_size, shuffle=True):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare list-built LSTM windows with the strided window dataset."
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--time-steps", type=int, default=60)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        for name, builder in [
+            ("lists + DataLoader", batches_with_lists),
+            ("WindowDataset + WindowBatcher", batches_with_views),
+        ]:
+            seconds, rss_mb = run_isolated(
+                builder, rows, args.time_steps, args.batch_size
+            )
+            results.append([name, rows, f"{seconds:.2f}", f"{rss_mb:.0f}"])
+
+    print(
+        f"Building and batching one epoch of {args.time_steps}-step windows "
+        f"(batch size {args.batch_size}):"
+    )
+    print_table(["pipeline", "rows", "seconds", "peak RSS (MB)"], results)
+
+
+if __name__ == "__main__":
+    main()
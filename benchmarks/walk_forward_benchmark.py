@@ -0,0 +1,54 @@
+import argparse
+import importlib.util
+import os
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from data.utils.data_preprocessing import preprocess_data
+from utils.walk_forward import WalkForwardValidator
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare a sequential and a parallel walk-forward backtest."
+    )
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--folds", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    model_names = ["random_forest_time_series"]
+    if importlib.util.find_spec("xgboost") is not None:
+        model_names.append("xgboost_time_series")
+
+    data = preprocess_data(synthetic_ohlcv(args.rows))
+    rows = []
+    for name, workers in [("sequential", 1), ("process pool", args.workers)]:
+        results = WalkForwardValidator(n_folds=args.folds, max_workers=workers).run(
+            data, model_names
+        )
+        fold_seconds = (
+            (results["train_seconds"] + results["inference_seconds"])
+            .groupby(results["fold"])
+            .sum()
+        )
+        rows.append(
+            [
+                name,
+                workers,
+                f"{results.attrs['elapsed_seconds']:.1f}",
+                f"{fold_seconds.sum():.1f}",
+                f"{fold_seconds.max():.1f}",
+            ]
+        )
+
+    print(
+        f"{args.folds}-fold backtest of {', '.join(model_names)} on {args.rows} rows "
+        f"({os.cpu_count()} CPUs):"
+    )
+    print_table(
+        ["mode", "workers", "wall seconds", "sum of folds", "slowest fold"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
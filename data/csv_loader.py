@@ -1,17 +1,62 @@
+from typing import Iterator
+
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+from data.series_cache import OHLCV_COLUMNS, OHLCV_DTYPES
+
+CSV_ENGINES = ["c", "pyarrow"]
 
 
 class CSVLoader:
     """
     A class to load and preprocess CSV files.
     Provides functionality to load a CSV file and ensure it's preprocessed.
+
+    Besides loading a whole file, it can stream just the OHLCV columns of very large
+    exports in fixed-size chunks, optionally keeping only a date range, so memory
+    stays bounded by the chunk size rather than the file size.
     """
 
+    # pylint: disable=too-many-arguments
     @staticmethod
-    def load_csv(file_path: str) -> pd.DataFrame:
-        """Load and preprocess CSV data."""
+    def load_csv(
+        file_path: str,
+        ohlcv_only: bool = False,
+        engine: str = "c",
+        start_date=None,
+        end_date=None,
+        chunksize: int = 100_000,
+    ) -> pd.DataFrame:
+        """
+        Load and preprocess CSV data.
+
+        :param ohlcv_only: Only read the date and OHLCV columns, with explicit dtypes.
+        :param engine: 'c' or 'pyarrow' parser used in OHLCV mode.
+        :param start_date: Optional inclusive lower bound on 'date'.
+        :param end_date: Optional inclusive upper bound on 'date'.
+        :param chunksize: Rows per chunk when streaming in OHLCV mode.
+        """
         try:
-            data = pd.read_csv(file_path, parse_dates=["date"])
+            if ohlcv_only or start_date is not None or end_date is not None:
+                # Stream the file so only the requested rows are ever held in memory
+                chunks = list(
+                    CSVLoader.iter_csv_chunks(
+                        file_path,
+                        chunksize=chunksize,
+                        engine=engine,
+                        start_date=start_date,
+                        end_date=end_date,
+                    )
+                )
+                data = (
+                    pd.concat(chunks, ignore_index=True)
+                    if chunks
+                    else pd.DataFrame(columns=OHLCV_COLUMNS)
+                )
+            else:
+                data = pd.read_csv(file_path, parse_dates=["date"])
             # Ensure 'date' is a datetime object and sorted
             data = data.sort_values(by="date")
             print(f"Data loaded successfully from {file_path}")
@@ -20,6 +65,115 @@ class CSVLoader:
             FileNotFoundError,
             pd.errors.EmptyDataError,
             pd.errors.ParserError,
+            ValueError,
         ) as e:
             print(f"Error loading CSV: {e}")
             return None  # type: ignore
+
+    # pylint: disable=too-many-arguments
+    @staticmethod
+    def iter_csv_chunks(
+        file_path: str,
+        chunksize: int = 100_000,
+        engine: str = "c",
+        start_date=None,
+        end_date=None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield the date and OHLCV columns of a CSV file in chunks of at most
+        chunksize rows, in file order.
+
+        Unused columns are never parsed, prices and volume are read straight into
+        float64 and dates are parsed as ISO 8601 timestamps in UTC. Chunks with no
+        rows between start_date and end_date (both inclusive) are skipped.
+
+        :param engine: 'c' streams with pandas, 'pyarrow' streams record batches
+            with pyarrow's streaming CSV reader.
+        :raises: ValueError if the engine is unknown or columns are missing.
+        """
+        if engine not in CSV_ENGINES:
+            raise ValueError(
+                f"Unsupported engine: {engine}. Supported engines: {CSV_ENGINES}"
+            )
+        start = _to_utc(start_date)
+        end = _to_utc(end_date)
+        # A bare date as upper bound includes the whole day
+        if end is not None and end == end.normalize():
+            end = end + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+
+        if engine == "pyarrow":
+            chunks = _iter_pyarrow_chunks(file_path, chunksize)
+        else:
+            chunks = pd.read_csv(
+                file_path,
+                usecols=OHLCV_COLUMNS,
+                dtype={**OHLCV_DTYPES, "date": "string"},
+                chunksize=chunksize,
+            )
+
+        for chunk in chunks:
+            chunk["date"] = pd.to_datetime(chunk["date"], format="ISO8601", utc=True)
+            if start is not None:
+                chunk = chunk[chunk["date"] >= start]
+            if end is not None:
+                chunk = chunk[chunk["date"] <= end]
+            if not chunk.empty:
+                yield chunk[OHLCV_COLUMNS].reset_index(drop=True)
+
+    # pylint: disable=too-many-arguments
+    @staticmethod
+    def load_csv_to_store(
+        file_path: str,
+        store,
+        symbol: str,
+        frequency: str,
+        chunksize: int = 100_000,
+        engine: str = "c",
+    ) -> int:
+        """
+        Stream the OHLCV columns of a CSV file into an OHLCVStore chunk by chunk.
+
+        :param store: OHLCVStore the bars are written to.
+        :return: Number of rows written.
+        """
+        rows = 0
+        for chunk in CSVLoader.iter_csv_chunks(
+            file_path, chunksize=chunksize, engine=engine
+        ):
+            rows += store.write(symbol, frequency, chunk)
+        return rows
+
+
+def _to_utc(value):
+    """Convert an optional date-like value to a UTC timestamp."""
+    if value is None:
+        return None
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def _iter_pyarrow_chunks(file_path, chunksize):
+    """Stream the OHLCV columns of a CSV file as frames of chunksize rows using pyarrow."""
+    column_types = {column: pa.float64() for column in OHLCV_DTYPES}
+    column_types["date"] = pa.string()
+    reader = pa_csv.open_csv(
+        file_path,
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=OHLCV_COLUMNS, column_types=column_types
+        ),
+    )
+
+    # Record batches are sized in bytes, so regroup them into fixed-size chunks
+    pending, pending_rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunksize:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunksize).to_pandas()
+            remainder = table.slice(chunksize)
+            pending, pending_rows = remainder.to_batches(), remainder.num_rows
+    if pending_rows:
+        yield pa.Table.from_batches(pending).to_pandas()
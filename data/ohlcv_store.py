@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data.csv_loader import CSVLoader
+from data.series_cache import OHLCV_COLUMNS, OHLCV_DTYPES
+
+# Dates are stored as int64 nanoseconds since the epoch in UTC
+DATE_DTYPE = np.dtype("int64")
+UTC_DTYPE = pd.DatetimeTZDtype("ns", "UTC")
+STORE_DTYPES = {
+    "date": DATE_DTYPE,
+    **{column: np.dtype(dtype) for column, dtype in OHLCV_DTYPES.items()},
+}
+
+
+def _to_ns(value):
+    """Convert a date-like value to int64 nanoseconds since the epoch in UTC."""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC").as_unit("ns").value
+
+
+class OHLCVSeries:
+    """
+    The bars of one symbol and frequency, stored as one fixed-width binary file per
+    column in a folder and read through memory maps.
+
+    Bars are kept sorted by date, so a date range is located with a binary search
+    on the date column and returned as views into the memory maps, without
+    copying. Bars newer than the last stored bar are appended to the end of the
+    files; overlapping bars only rewrite the tail of the series from the first
+    overlapping date.
+
+    The row count in meta.json is only updated once the columns are written, so
+    readers never see a partially appended bar. Column files never shrink, which
+    keeps earlier views valid while the series grows.
+    """
+
+    META_FILENAME = "meta.json"
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(self.folder, exist_ok=True)
+        self.meta_path = os.path.join(self.folder, self.META_FILENAME)
+        self._lock = threading.RLock()
+        self._maps = {}
+        self.rows = self._load_rows()
+
+    def _load_rows(self):
+        if not os.path.exists(self.meta_path):
+            return 0
+        with open(self.meta_path, "r", encoding="utf-8") as file:
+            return json.load(file)["rows"]
+
+    def _save_rows(self, rows):
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "rows": rows,
+                    "columns": {
+                        name: dtype.str for name, dtype in STORE_DTYPES.items()
+                    },
+                },
+                file,
+            )
+        os.replace(tmp_path, self.meta_path)
+        self.rows = rows
+
+    def _column_path(self, column):
+        return os.path.join(self.folder, f"{column}.bin")
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, column) -> np.ndarray:
+        """Read-only memory-mapped view of a whole column."""
+        with self._lock:
+            if self.rows == 0:
+                return np.empty(0, dtype=STORE_DTYPES[column])
+            cached = self._maps.get(column)
+            if cached is None or len(cached) != self.rows:
+                cached = np.memmap(
+                    self._column_path(column),
+                    dtype=STORE_DTYPES[column],
+                    mode="r",
+                    shape=(self.rows,),
+                )
+                self._maps[column] = cached
+            return cached
+
+    def bounds(self, start=None, end=None):
+        """
+        Row positions of the bars in [start, end), found by binary search.
+
+        :param start: Optional inclusive lower bound on the bar date.
+        :param end: Optional exclusive upper bound on the bar date.
+        :return: Tuple (first, stop) of row positions.
+        """
+        dates = self.column("date")
+        first = 0 if start is None else int(np.searchsorted(dates, _to_ns(start)))
+        stop = len(dates) if end is None else int(np.searchsorted(dates, _to_ns(end)))
+        return first, max(first, stop)
+
+    def arrays(self, start=None, end=None) -> dict:
+        """Zero-copy NumPy views of the bars in [start, end), with int64 ns dates."""
+        first, stop = self.bounds(start, end)
+        return {column: self.column(column)[first:stop] for column in STORE_DTYPES}
+
+    def to_frame(self, start=None, end=None) -> pd.DataFrame:
+        """Bars in [start, end) as a DataFrame backed by the memory maps."""
+        arrays = self.arrays(start, end)
+        columns = {
+            column: pd.Series(
+                arrays[column],
+                dtype=UTC_DTYPE if column == "date" else None,
+                copy=False,
+            )
+            for column in OHLCV_COLUMNS
+        }
+        return pd.DataFrame(columns, copy=False)
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Add normalized bars to the series.
+
+        Bars after the last stored bar are appended. Otherwise the stored bars from
+        the first new date onwards are merged with the new bars, keeping the new
+        bar for duplicate dates, and written back in place.
+
+        :return: Number of rows written.
+        """
+        if df.empty:
+            return 0
+        dates = pd.to_datetime(df["date"], utc=True).dt.as_unit("ns")
+        new = {"date": dates.array.asi8}
+        for column, dtype in OHLCV_DTYPES.items():
+            new[column] = df[column].to_numpy(dtype=dtype)
+
+        with self._lock:
+            order = np.argsort(new["date"], kind="stable")
+            new = {column: values[order] for column, values in new.items()}
+            position = int(np.searchsorted(self.column("date"), new["date"][0]))
+
+            if position < self.rows:
+                # Merge with the tail of the series, keeping the new bars on ties
+                tail = {
+                    column: np.concatenate([self.column(column)[position:], values])
+                    for column, values in new.items()
+                }
+                order = np.argsort(tail["date"], kind="stable")
+                tail = {column: values[order] for column, values in tail.items()}
+                keep = np.append(tail["date"][1:] != tail["date"][:-1], True)
+                new = {column: values[keep] for column, values in tail.items()}
+            else:
+                keep = np.append(new["date"][1:] != new["date"][:-1], True)
+                new = {column: values[keep] for column, values in new.items()}
+
+            for column, values in new.items():
+                mode = "r+b" if os.path.exists(self._column_path(column)) else "wb"
+                with open(self._column_path(column), mode) as file:
+                    file.seek(position * values.itemsize)
+                    file.write(np.ascontiguousarray(values).tobytes())
+            self._save_rows(position + len(new["date"]))
+            return len(new["date"])
+
+
+class OHLCVStore:
+    """
+    An on-disk store holding one memory-mapped OHLCVSeries per symbol and frequency.
+
+    DataFetcher writes fetched bars into it, CSVLoader streams CSV files into it and
+    train.py can load training data from it.
+    """
+
+    def __init__(self, root="data/store"):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(symbol, frequency):
+        return f"{symbol.lower()}_{frequency}"
+
+    def series(self, symbol, frequency) -> OHLCVSeries:
+        """The series of a symbol and frequency, created empty if it does not exist."""
+        key = self._key(symbol, frequency)
+        with self._lock:
+            if key not in self._series:
+                self._series[key] = OHLCVSeries(os.path.join(self.root, key))
+            return self._series[key]
+
+    def keys(self):
+        """Keys ('<symbol>_<frequency>') of the series in the store."""
+        return sorted(
+            name
+            for name in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, name, OHLCVSeries.META_FILENAME))
+        )
+
+    def write(self, symbol, frequency, df: pd.DataFrame) -> int:
+        """Add normalized bars to a series, returning the number of rows written."""
+        return self.series(symbol, frequency).append(df)
+
+    def read(self, symbol, frequency, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Read the bars of a series between two optional inclusive dates.
+
+        A bare date as end_date includes the whole day. The frame shares memory
+        with the store and is read-only.
+        """
+        end = None
+        if end_date is not None:
+            end = pd.Timestamp(end_date)
+            if end == end.normalize():
+                end = end + pd.Timedelta(days=1)
+            else:
+                end = end + pd.Timedelta(1, "ns")
+        return self.series(symbol, frequency).to_frame(start_date, end)
+
+
+if __name__ == "__main__":
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(
+        description="Import a CSV file into the memory-mapped OHLCV store."
+    )
+    parser.add_argument("input_file", help="Path to a CSV file with OHLCV columns")
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument("--frequency", required=True)
+    parser.add_argument("--store", help="Folder of the store", default="data/store")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+
+    args = parser.parse_args()
+
+    rows = CSVLoader.load_csv_to_store(
+        args.input_file,
+        OHLCVStore(args.store),
+        args.symbol,
+        args.frequency,
+        chunksize=args.chunksize,
+    )
+    print(f"Imported {rows} rows of {args.symbol} {args.frequency} into {args.store}")
@@ -0,0 +1,284 @@
+import json
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+# Columns and dtypes of the cached OHLCV schema. Cached files are stored with these
+# types so they can be loaded without re-parsing dates and floats on every run.
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+OHLCV_DTYPES = {
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+}
+CACHE_FORMATS = ["parquet", "csv"]
+
+# Per-request cache files written by earlier versions of the fetcher
+LEGACY_FILENAME_PATTERN = re.compile(
+    r"^(?P<symbol>.+)_(?P<start>\d{4}-\d{2}-\d{2})_to_(?P<end>\d{4}-\d{2}-\d{2})_(?P<frequency>[^_]+)\.(?P<format>csv|parquet)$"
+)
+
+ONE_DAY = pd.Timedelta(days=1)
+
+
+def apply_ohlcv_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast a normalized frame to the explicit OHLCV cache schema."""
+    if df.empty:
+        return df
+    df = df[OHLCV_COLUMNS].copy()
+    df["date"] = pd.to_datetime(df["date"], errors="coerce", utc=True)
+    return df.astype(OHLCV_DTYPES)
+
+
+def read_ohlcv_file(filename, start=None, end=None) -> pd.DataFrame:
+    """
+    Read a cached OHLCV file, memory-mapping Parquet files where possible.
+
+    :param start: Optional inclusive lower bound (UTC timestamp) on 'date'.
+    :param end: Optional exclusive upper bound (UTC timestamp) on 'date'.
+    """
+    if filename.endswith(".parquet"):
+        filters = []
+        if start is not None:
+            filters.append(("date", ">=", start))
+        if end is not None:
+            filters.append(("date", "<", end))
+        return pd.read_parquet(
+            filename, engine="pyarrow", memory_map=True, filters=filters or None
+        )
+
+    df = apply_ohlcv_dtypes(pd.read_csv(filename))
+    if start is not None:
+        df = df[df["date"] >= start]
+    if end is not None:
+        df = df[df["date"] < end]
+    return df.reset_index(drop=True)
+
+
+def write_ohlcv_file(df: pd.DataFrame, filename) -> pd.DataFrame:
+    """Write a normalized frame in the file's format, returning the typed frame."""
+    df = apply_ohlcv_dtypes(df)
+    if filename.endswith(".parquet"):
+        df.to_parquet(filename, engine="pyarrow", index=False)
+    else:
+        df.to_csv(filename, index=False)
+    return df
+
+
+def _day(value) -> pd.Timestamp:
+    """Normalize a date-like value to a UTC midnight timestamp."""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC").normalize()
+
+
+def _merge_ranges(ranges):
+    """Merge overlapping or adjacent inclusive day ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class SeriesCache:
+    """
+    A cache that keeps one canonical OHLCV series per symbol and frequency.
+
+    Coverage is tracked as the inclusive day ranges that have been requested from
+    the provider, so ranges with no bars (weekends, holidays) are not re-fetched.
+    The total size of the cache folder is bounded by evicting the least recently
+    used series. A single instance can be shared between threads.
+    """
+
+    INDEX_FILENAME = "cache_index.json"
+
+    def __init__(
+        self, cache_folder="data/sets", cache_format="parquet", max_size_bytes=2**31
+    ):
+        if cache_format not in CACHE_FORMATS:
+            raise ValueError(
+                f"Unsupported cache format: {cache_format}. Supported formats: {CACHE_FORMATS}"
+            )
+        self.cache_folder = cache_folder
+        self.cache_format = cache_format
+        self.max_size_bytes = max_size_bytes
+        os.makedirs(self.cache_folder, exist_ok=True)
+        self.index_path = os.path.join(self.cache_folder, self.INDEX_FILENAME)
+        self.index = self._load_index()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(symbol, frequency):
+        return f"{symbol.lower()}_{frequency}"
+
+    def _filename(self, key):
+        return os.path.join(self.cache_folder, f"{key}.{self.cache_format}")
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache index {self.index_path}: {e}")
+            return {}
+
+    def _save_index(self):
+        # Write to a temporary file first so readers never see a partial index
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.index, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _coverage(self, key):
+        entry = self.index.get(key, {})
+        return [[_day(start), _day(end)] for start, end in entry.get("covered", [])]
+
+    def missing_ranges(self, symbol, frequency, start_date, end_date):
+        """
+        Work out which parts of [start_date, end_date] are not cached yet.
+
+        :return: List of (start, end) inclusive 'YYYY-MM-DD' ranges to fetch.
+        """
+        key = self._key(symbol, frequency)
+        start, end = _day(start_date), _day(end_date)
+        if not os.path.exists(self._filename(key)):
+            return [(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))]
+
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self._coverage(key):
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - ONE_DAY))
+            cursor = covered_end + ONE_DAY
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return [(s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d")) for s, e in gaps]
+
+    def read(self, symbol, frequency, start_date, end_date) -> pd.DataFrame:
+        """Read the cached bars between two inclusive dates."""
+        with self._lock:
+            key = self._key(symbol, frequency)
+            filename = self._filename(key)
+            if not os.path.exists(filename):
+                return pd.DataFrame()
+
+            self._touch(key)
+            self._save_index()
+            return read_ohlcv_file(
+                filename, start=_day(start_date), end=_day(end_date) + ONE_DAY
+            )
+
+    def merge(self, symbol, frequency, df, ranges):
+        """
+        Merge newly fetched bars into the canonical series and mark the requested
+        ranges as covered.
+
+        Days from today onwards are never marked as covered since their bars are
+        still incomplete and must be fetched again on the next request.
+
+        :param ranges: List of inclusive (start, end) date ranges the bars cover.
+        """
+        with self._lock:
+            key = self._key(symbol, frequency)
+            filename = self._filename(key)
+
+            if not df.empty:
+                df = apply_ohlcv_dtypes(df)
+                if os.path.exists(filename):
+                    df = pd.concat([read_ohlcv_file(filename), df], ignore_index=True)
+                df = (
+                    df.dropna(subset=["date"])
+                    .drop_duplicates(subset="date", keep="last")
+                    .sort_values("date")
+                    .reset_index(drop=True)
+                )
+                write_ohlcv_file(df, filename)
+            elif not os.path.exists(filename):
+                # Nothing to cache yet, so coverage cannot be recorded either
+                return
+
+            last_complete_day = _day(pd.Timestamp.now(tz="UTC")) - ONE_DAY
+            coverage = self._coverage(key)
+            for start_date, end_date in ranges:
+                start, end = _day(start_date), min(_day(end_date), last_complete_day)
+                if start <= end:
+                    coverage.append([start, end])
+
+            entry = self.index.setdefault(key, {})
+            entry["covered"] = [
+                [s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d")]
+                for s, e in _merge_ranges(coverage)
+            ]
+            entry["size"] = os.path.getsize(filename)
+            self._touch(key)
+            self.evict(keep=key)
+            self._save_index()
+
+    def _touch(self, key):
+        self.index.setdefault(key, {})["last_access"] = time.time()
+
+    def evict(self, keep=None):
+        """Remove least recently used series until the cache fits its size limit."""
+        with self._lock:
+            total_size = sum(entry.get("size", 0) for entry in self.index.values())
+            by_age = sorted(
+                self.index, key=lambda k: self.index[k].get("last_access", 0)
+            )
+            for key in by_age:
+                if self.max_size_bytes is None or total_size <= self.max_size_bytes:
+                    break
+                if key == keep:
+                    continue
+                total_size -= self.index[key].get("size", 0)
+                filename = self._filename(key)
+                if os.path.exists(filename):
+                    os.remove(filename)
+                del self.index[key]
+                print(f"Evicted {filename} from the cache")
+
+    def import_legacy_file(self, filename, remove_legacy=False):
+        """
+        Merge a per-request cache file from an earlier version into the canonical
+        series, using the date range encoded in its name as covered range.
+
+        :return: True if the file was imported.
+        """
+        match = LEGACY_FILENAME_PATTERN.match(os.path.basename(filename))
+        if match is None or not os.path.exists(filename):
+            return False
+        try:
+            df = read_ohlcv_file(filename)
+        except (KeyError, ValueError, pd.errors.ParserError) as e:
+            print(f"Skipping {filename}: {e}")
+            return False
+        self.merge(
+            match["symbol"], match["frequency"], df, [(match["start"], match["end"])]
+        )
+        if remove_legacy:
+            os.remove(filename)
+        print(f"Imported {filename} into the {self.cache_format} cache")
+        return True
+
+    def import_legacy_files(self, remove_legacy=False):
+        """Import every per-request cache file in the cache folder."""
+        imported = []
+        for name in sorted(os.listdir(self.cache_folder)):
+            filename = os.path.join(self.cache_folder, name)
+            if self.import_legacy_file(filename, remove_legacy=remove_legacy):
+                imported.append(filename)
+        return imported
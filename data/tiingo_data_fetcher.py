@@ -1,8 +1,29 @@
+import asyncio
+import hashlib
+import heapq
+import json
 import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
 
+import numpy as np
 import pandas as pd
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from data.series_cache import CACHE_FORMATS, SeriesCache
+
+try:
+    import fcntl
+except ImportError:  # Windows, where the state file is only shared within a process
+    fcntl = None
 
 # Load the .env.local file if it exists, otherwise load .env
 if os.path.exists(".env.local"):
@@ -14,41 +35,470 @@ else:
 
 # Retrieve the API keys from environment variables
 TIINGO_API_KEY = os.getenv("TIINGO_API_KEY")
-BASE_APIURL = "https://api.tiingo.com"
+# Can point at a local stand-in such as data/utils/tiingo_replay_server.py
+BASE_APIURL = os.getenv("TIINGO_BASE_APIURL", "https://api.tiingo.com")
+
+# Upper bound on the number of bars requested per chunk for intraday frequencies
+CHUNK_BARS = 5000
+FREQUENCY_PATTERN = re.compile(r"^(\d+)(min|hour|day)$")
+FREQUENCY_MINUTES = {"min": 1, "hour": 60, "day": 24 * 60}
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Number of consecutive 429 responses waited out before a request gives up
+RATE_LIMIT_RETRIES = 5
+# Maximum number of tickers batched into one comma-separated crypto request
+CRYPTO_BATCH_SIZE = 20
+ASSET_TYPES = ["stock", "crypto"]
+
+# Request caps of the Tiingo plan, shared by every process using the same key.
+# The defaults match the free plan; set them to your plan's limits in .env.
+TIINGO_REQUESTS_PER_HOUR = int(os.getenv("TIINGO_REQUESTS_PER_HOUR", "50"))
+TIINGO_REQUESTS_PER_DAY = int(os.getenv("TIINGO_REQUESTS_PER_DAY", "1000"))
+
+# Request priorities, lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 10
+
+
+def _to_ns_dates(dates):
+    """Convert a date column to int64 nanoseconds since the epoch in UTC."""
+    return pd.to_datetime(dates, utc=True).dt.as_unit("ns").array.asi8
+
+
+def _parse_retry_after(value, default):
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RequestScheduler:
+    """
+    A token-bucket scheduler that every Tiingo request goes through.
+
+    Each limit is a bucket of `requests` tokens refilled evenly over `period`
+    seconds, and a request needs one token from every bucket. The bucket state is
+    kept in a small JSON file guarded by a file lock, so concurrent training jobs
+    sharing an API key also share its quota. Within a process, waiting requests are
+    served in priority order. A 429 response pauses every process until its
+    Retry-After has passed.
+    """
+
+    def __init__(self, requests_per_hour=None, requests_per_day=None, state_path=None):
+        self.limits = {
+            name: (requests, period)
+            for name, requests, period in [
+                ("hour", requests_per_hour, 3600),
+                ("day", requests_per_day, 86400),
+            ]
+            if requests
+        }
+        if state_path is None:
+            key_hash = hashlib.sha256(str(TIINGO_API_KEY).encode()).hexdigest()[:12]
+            state_path = os.path.join(
+                tempfile.gettempdir(), f"tiingo_rate_limit_{key_hash}.json"
+            )
+        self.state_path = state_path
+        self._condition = threading.Condition()
+        self._waiting = []  # Heap of (priority, sequence) of the waiting requests
+        self._sequence = 0
+
+    @contextmanager
+    def _locked_state(self):
+        """Yield the shared state, holding the cross-process lock until it is saved."""
+        with open(f"{self.state_path}.lock", "a", encoding="utf-8") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.state_path, "r", encoding="utf-8") as file:
+                        state = json.load(file)
+                except (OSError, ValueError):
+                    state = {}
+                yield state
+                tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as file:
+                    json.dump(state, file)
+                os.replace(tmp_path, self.state_path)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _try_take_token(self):
+        """
+        Take one token from every bucket if all of them have one.
+
+        :return: 0 if the tokens were taken, otherwise the seconds to wait.
+        """
+        if not self.limits:
+            return 0.0
+        now = time.time()
+        with self._locked_state() as state:
+            wait = state.get("blocked_until", 0) - now
+            if wait > 0:
+                return wait
+
+            buckets = {}
+            for name, (requests_limit, period) in self.limits.items():
+                rate = requests_limit / period
+                bucket = state.get(name, {"tokens": requests_limit, "updated": now})
+                tokens = min(
+                    requests_limit, bucket["tokens"] + (now - bucket["updated"]) * rate
+                )
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+                buckets[name] = {"tokens": tokens, "updated": now}
+
+            if wait <= 0:
+                for bucket in buckets.values():
+                    bucket["tokens"] -= 1
+            state.update(buckets)
+            return max(wait, 0.0)
 
+    def acquire(self, priority=PRIORITY_DEFAULT):
+        """Block until a request of the given priority may be sent."""
+        with self._condition:
+            self._sequence += 1
+            ticket = (priority, self._sequence)
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        wait = self._try_take_token()
+                        if wait <= 0:
+                            return
+                        if wait > 60:
+                            print(
+                                f"Tiingo request quota exhausted, waiting {wait:.0f}s..."
+                            )
+                    else:
+                        wait = None  # Wait for the requests ahead of this one
+                    self._condition.wait(timeout=wait)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
 
+    def defer(self, seconds):
+        """Pause every request sharing this quota for the given number of seconds."""
+        with self._locked_state() as state:
+            state["blocked_until"] = max(
+                state.get("blocked_until", 0), time.time() + seconds
+            )
+
+
+_DEFAULT_SCHEDULER = None
+_DEFAULT_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_default_scheduler():
+    """Return the process-wide scheduler configured with the plan's request caps."""
+    global _DEFAULT_SCHEDULER  # pylint: disable=global-statement
+    with _DEFAULT_SCHEDULER_LOCK:
+        if _DEFAULT_SCHEDULER is None:
+            _DEFAULT_SCHEDULER = RequestScheduler(
+                requests_per_hour=TIINGO_REQUESTS_PER_HOUR,
+                requests_per_day=TIINGO_REQUESTS_PER_DAY,
+            )
+        return _DEFAULT_SCHEDULER
+
+
+# pylint: disable=too-many-instance-attributes
 class DataFetcher:
     """
     A class to fetch and normalize data for stocks and cryptocurrencies from Tiingo.
+
+    Fetched bars are kept in one canonical cached series per symbol and frequency,
+    so only the date ranges that are not cached yet are requested from Tiingo.
+    Long intraday ranges are split into chunks that are fetched concurrently over
+    a shared keep-alive session, each with its own retries. Every request goes
+    through a RequestScheduler so the plan's request caps are never exceeded.
+    Served bars can also be written to a memory-mapped OHLCVStore.
     """
 
-    def __init__(self, cache_folder="data/sets"):
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        cache_folder="data/sets",
+        cache_format="parquet",
+        max_cache_bytes=2**31,
+        base_url=None,
+        max_workers=4,
+        max_retries=3,
+        backoff_factor=0.5,
+        timeout=10,
+        chunk_bars=CHUNK_BARS,
+        scheduler=None,
+        store=None,
+    ):
         self.cache_folder = cache_folder
-        if not os.path.exists(self.cache_folder):
-            os.makedirs(self.cache_folder)  # Ensure the 'sets' folder exists
+        self.cache = SeriesCache(
+            cache_folder=cache_folder,
+            cache_format=cache_format,
+            max_size_bytes=max_cache_bytes,
+        )
+        self.base_url = base_url or BASE_APIURL
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.chunk_bars = chunk_bars
+        self.scheduler = scheduler or get_default_scheduler()
+        # Optional OHLCVStore that every served series is also written to
+        self.store = store
+
+        # One pooled session shared by all worker threads so connections are reused
+        self.session = requests.Session()
+        self._pool_size = 0
+        self._ensure_pool_size(max_workers)
+        self.session.headers.update(
+            {
+                "Content-Type": "application/json",
+                "Authorization": f"Token {TIINGO_API_KEY}",
+            }
+        )
+
+    def _ensure_pool_size(self, size):
+        """Grow the session's connection pool to hold at least size connections."""
+        if size <= self._pool_size:
+            return
+        adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool_size = size
 
-    def _generate_filename(self, symbol, start_date, end_date, frequency):
-        """Generate a unique filename for the CSV based on the symbol and parameters."""
+    def _generate_filename(
+        self, symbol, start_date, end_date, frequency, cache_format="csv"
+    ):
+        """Generate the per-request filename used by earlier versions of the cache."""
         return os.path.join(
-            self.cache_folder, f"{symbol}_{start_date}_to_{end_date}_{frequency}.csv"
+            self.cache_folder,
+            f"{symbol}_{start_date}_to_{end_date}_{frequency}.{cache_format}",
         )
 
-    def fetch_tiingo_stock_data(self, symbol, start_date, end_date, frequency="daily"):
+    def migrate_legacy_cache(self, remove_legacy=False):
+        """
+        Import every per-request CSV or Parquet file written by earlier versions
+        into the canonical cached series.
+
+        :param remove_legacy: Delete each legacy file once it has been imported.
+        :return: List of the legacy files that were imported.
+        """
+        return self.cache.import_legacy_files(remove_legacy=remove_legacy)
+
+    def _split_range(self, start_date, end_date, frequency):
+        """
+        Split an inclusive date range into consecutive chunks of at most
+        chunk_bars bars. Frequencies of a day or longer are never split.
+        """
+        match = FREQUENCY_PATTERN.match(frequency)
+        if self.chunk_bars is None or match is None:
+            return [(start_date, end_date)]
+        bar_minutes = int(match[1]) * FREQUENCY_MINUTES[match[2]]
+        chunk_days = max(1, (self.chunk_bars * bar_minutes) // FREQUENCY_MINUTES["day"])
+
+        chunks = []
+        chunk_start = pd.Timestamp(start_date)
+        last_day = pd.Timestamp(end_date)
+        while chunk_start <= last_day:
+            chunk_end = min(chunk_start + pd.Timedelta(days=chunk_days - 1), last_day)
+            chunks.append(
+                (chunk_start.strftime("%Y-%m-%d"), chunk_end.strftime("%Y-%m-%d"))
+            )
+            chunk_start = chunk_end + pd.Timedelta(days=1)
+        return chunks
+
+    def _get_json(self, url, params, priority=PRIORITY_DEFAULT):
+        """
+        GET a Tiingo endpoint over the shared session once the scheduler allows it,
+        retrying connection errors, timeouts and server errors with exponential
+        backoff. Rate limited (429) responses pause every request sharing the
+        quota for the Retry-After period and do not use up the retries.
+
+        :return: The decoded JSON body, or None once all retries have failed.
+        """
+        attempt = 0
+        rate_limited = 0
+        while True:
+            self.scheduler.acquire(priority)
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code == 429 and rate_limited < RATE_LIMIT_RETRIES:
+                    rate_limited += 1
+                    delay = _parse_retry_after(
+                        response.headers.get("Retry-After"),
+                        self.backoff_factor * 2**rate_limited,
+                    )
+                    print(
+                        f"Rate limited by Tiingo, pausing requests for {delay:.1f}s..."
+                    )
+                    self.scheduler.defer(delay)
+                    continue
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()  # Raise an exception for HTTP errors
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                error = str(e)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"Request error: {e}")
+                return None
+
+            if attempt >= self.max_retries:
+                print(f"Request error: {error}, giving up after {attempt + 1} attempts")
+                return None
+            delay = self.backoff_factor * 2**attempt
+            print(f"Request error: {error}, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            attempt += 1
+
+    # pylint: disable=too-many-arguments
+    def _fetch_with_cache(
+        self, symbol, start_date, end_date, frequency, request, priority
+    ):
+        """
+        Serve a request from the canonical cache, fetching only the missing ranges.
+
+        Missing ranges are split into chunks that are fetched concurrently. Chunks
+        that fail are left uncovered so they are retried on the next request,
+        while the chunks that succeeded are kept.
+
+        :param request: Callable (symbol, start, end, frequency, priority)
+            returning a normalized frame, or None if the request failed.
+        :param priority: Scheduler priority of the requests.
+        """
+        gaps = self.cache.missing_ranges(symbol, frequency, start_date, end_date)
+        if gaps:
+            # Pick up a per-request file from an earlier version for this exact
+            # range. It is kept, deleting legacy files is left to migrate_legacy_cache
+            imported = [
+                self.cache.import_legacy_file(
+                    self._generate_filename(
+                        symbol, start_date, end_date, frequency, cache_format
+                    )
+                )
+                for cache_format in CACHE_FORMATS
+            ]
+            if any(imported):
+                gaps = self.cache.missing_ranges(
+                    symbol, frequency, start_date, end_date
+                )
+
+        chunks = [chunk for gap in gaps for chunk in self._split_range(*gap, frequency)]
+        fetched_bars = None
+        if chunks:
+            print(f"Fetching {symbol} data in {len(chunks)} chunk(s)...")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # map() yields results in submission order, keeping chunks in order
+                results = list(
+                    executor.map(
+                        lambda chunk: request(symbol, *chunk, frequency, priority),
+                        chunks,
+                    )
+                )
+
+            fetched = [
+                (chunk, df) for chunk, df in zip(chunks, results) if df is not None
+            ]
+            if len(fetched) < len(chunks):
+                print(
+                    f"{len(chunks) - len(fetched)} of {len(chunks)} chunk(s) failed for {symbol}"
+                )
+            if fetched:
+                frames = [df for _, df in fetched if not df.empty]
+                fetched_bars = (
+                    pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+                )
+                self.cache.merge(
+                    symbol, frequency, fetched_bars, [chunk for chunk, _ in fetched]
+                )
+
+        print(f"Loading {symbol} data from the cache...")
+        return self._read_cache(symbol, frequency, start_date, end_date, fetched_bars)
+
+    # pylint: disable=too-many-arguments
+    def _read_cache(self, symbol, frequency, start_date, end_date, fetched=None):
+        """
+        Read bars from the cache, writing them through to the store if set.
+
+        Only the bars that were just fetched or are newer than the last stored bar
+        are written, since the store rewrites its tail from the first written date.
+
+        :param fetched: Frame of the bars fetched for this request, if any.
+        """
+        df = self.cache.read(symbol, frequency, start_date, end_date)
+        if self.store is None or df.empty:
+            return df
+
+        series = self.store.series(symbol, frequency)
+        if len(series):
+            dates = _to_ns_dates(df["date"])
+            new = dates > series.column("date")[-1]
+            if fetched is not None and not fetched.empty:
+                new |= np.isin(dates, _to_ns_dates(fetched["date"]))
+            if not new.any():
+                return df
+            self.store.write(symbol, frequency, df[new])
+        else:
+            self.store.write(symbol, frequency, df)
+        return df
+
+    # pylint: disable=too-many-arguments
+    def fetch_tiingo_stock_data(
+        self,
+        symbol,
+        start_date,
+        end_date,
+        frequency="daily",
+        priority=PRIORITY_INTERACTIVE,
+    ):
         """Fetch historical stock data from Tiingo."""
+        return self._fetch_with_cache(
+            symbol,
+            start_date,
+            end_date,
+            frequency,
+            self._request_stock_prices,
+            priority,
+        )
 
-        filename = self._generate_filename(symbol, start_date, end_date, frequency)
+    # pylint: disable=too-many-arguments
+    def fetch_tiingo_crypto_data(
+        self,
+        symbol,
+        start_date,
+        end_date,
+        frequency="5min",
+        priority=PRIORITY_INTERACTIVE,
+    ):
+        """Fetch historical cryptocurrency data from Tiingo."""
+        return self._fetch_with_cache(
+            symbol,
+            start_date,
+            end_date,
+            frequency,
+            self._request_crypto_prices,
+            priority,
+        )
 
-        # Check if the CSV file already exists
-        if os.path.exists(filename):
-            print(f"Loading stock data from {filename}...")
-            return pd.read_csv(filename)
+    # pylint: disable=too-many-arguments
+    def _request_stock_prices(
+        self, symbol, start_date, end_date, frequency, priority=PRIORITY_DEFAULT
+    ):
+        """Request stock prices from Tiingo, returning None on errors."""
 
-        # Define the URL, headers, and parameters for the request
-        url = f"{BASE_APIURL}/tiingo/daily/{symbol}/prices"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Token {TIINGO_API_KEY}",
-        }
+        # Define the URL and parameters for the request
+        url = f"{self.base_url}/tiingo/daily/{symbol}/prices"
         params = {
             "startDate": start_date,
             "endDate": end_date,
@@ -58,41 +508,44 @@ class DataFetcher:
             # annually: Values returned as annual data, with days ending on the last standard business day (Mon-Fri) of each year.
             "resampleFreq": frequency,
         }
-        response = requests.get(url, headers=headers, params=params, timeout=10)
 
-        if response.status_code != 200:
-            print(
-                f"Error fetching stock data from Tiingo for {symbol}: {response.status_code}"
-            )
-            return pd.DataFrame()  # Return an empty DataFrame if there’s an error
-
-        data = response.json()
-        df = self._normalize_tiingo_data(data, symbol)
+        data = self._get_json(url, params, priority)
+        if data is None:
+            print(f"Error fetching stock data from Tiingo for {symbol}")
+            return None
 
-        # Save the fetched data to CSV
-        print(f"Saving stock data to {filename}...")
-        df.to_csv(filename, index=False)
+        return self._normalize_tiingo_data(data, symbol)
 
-        return df
-
-    def fetch_tiingo_crypto_data(self, symbol, start_date, end_date, frequency="5min"):
-        """Fetch historical cryptocurrency data from Tiingo."""
+    # pylint: disable=too-many-arguments
+    def _request_crypto_prices(
+        self, symbol, start_date, end_date, frequency, priority=PRIORITY_DEFAULT
+    ):
+        """Request cryptocurrency prices from Tiingo, returning None on errors."""
+        prices = self._request_crypto_batch(
+            [symbol], start_date, end_date, frequency, priority
+        )
+        if prices is None:
+            return None
+        if symbol.lower() not in prices:
+            print(f"No crypto data found for {symbol}")
+            return pd.DataFrame()
+        return prices[symbol.lower()]
 
-        filename = self._generate_filename(symbol, start_date, end_date, frequency)
+    # pylint: disable=too-many-arguments
+    def _request_crypto_batch(
+        self, symbols, start_date, end_date, frequency, priority=PRIORITY_DEFAULT
+    ):
+        """
+        Request prices for several cryptocurrencies in one comma-separated
+        'tickers' request.
 
-        # Check if the CSV file already exists
-        if os.path.exists(filename):
-            print(f"Loading stock data from {filename}...")
-            return pd.read_csv(filename)
+        :return: Dict of lowercase ticker to normalized frame, or None on errors.
+        """
 
-        # Define the URL, headers, and parameters for the request
-        url = f"{BASE_APIURL}/tiingo/crypto/prices"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Token {TIINGO_API_KEY}",
-        }
+        # Define the URL and parameters for the request
+        url = f"{self.base_url}/tiingo/crypto/prices"
         params = {
-            "tickers": symbol,
+            "tickers": ",".join(symbols),
             "startDate": start_date,
             "endDate": end_date,
             # The minimum value is "1min". Units in minutes (min), hours (hour), and days (day) are accepted.
@@ -102,30 +555,183 @@ class DataFetcher:
         }
 
         # Send request to Tiingo API
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            return pd.DataFrame()
+        data = self._get_json(url, params, priority)
+        if data is None:
+            print(f"Error fetching crypto data from Tiingo for {params['tickers']}")
+            return None
 
         # Parse JSON response
         try:
-            data = response.json()
-            if not data or "priceData" not in data[0]:
-                print(f"No crypto data found for {symbol}")
-                return pd.DataFrame()
-        except (ValueError, KeyError) as e:
+            return {
+                item["ticker"].lower(): self._normalize_tiingo_data(
+                    item["priceData"], item["ticker"]
+                )
+                for item in data
+                if "priceData" in item
+            }
+        except (KeyError, TypeError) as e:
             print(f"Error parsing response data: {e}")
-            return pd.DataFrame()
+            return None
 
-        df = self._normalize_tiingo_data(data[0]["priceData"], symbol)
+    # pylint: disable=too-many-arguments
+    async def fetch_many(
+        self,
+        symbols,
+        start_date,
+        end_date,
+        frequency="daily",
+        asset_type=None,
+        max_concurrency=8,
+        long_format=False,
+        priority=PRIORITY_BULK,
+    ):
+        """
+        Fetch many stocks or cryptocurrencies concurrently.
 
-        # Save the fetched data to CSV
-        print(f"Saving crypto data to {filename}...")
-        df.to_csv(filename, index=False)
+        At most max_concurrency requests are in flight at once, so the wall-clock
+        time of a refresh scales with the concurrency limit rather than with the
+        number of symbols. Crypto tickers that miss the same range are batched into
+        comma-separated 'tickers' requests.
 
-        return df
+        :param symbols: List of ticker symbols.
+        :param asset_type: 'stock' or 'crypto'. Inferred from the frequency if not
+            given: Tiingo crypto frequencies look like '5min', '4hour' or '1day'.
+        :param max_concurrency: Maximum number of concurrent requests.
+        :param long_format: Return one frame with an 'asset' column instead of a
+            dict of symbol to frame.
+        :param priority: Scheduler priority of the requests, bulk refreshes yield
+            to interactive fetches by default.
+        """
+        if asset_type is None:
+            asset_type = "crypto" if FREQUENCY_PATTERN.match(frequency) else "stock"
+        if asset_type not in ASSET_TYPES:
+            raise ValueError(
+                f"Unsupported asset type: {asset_type}. Supported types: {ASSET_TYPES}"
+            )
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        self._ensure_pool_size(max_concurrency)
+        # A dedicated pool, since the loop's default executor may have fewer threads
+        # than the concurrency limit
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def limited(fn, *args):
+            async with semaphore:
+                return await loop.run_in_executor(executor, fn, *args)
+
+        try:
+            if asset_type == "stock":
+                frames = await asyncio.gather(
+                    *[
+                        limited(
+                            self.fetch_tiingo_stock_data,
+                            symbol,
+                            start_date,
+                            end_date,
+                            frequency,
+                            priority,
+                        )
+                        for symbol in symbols
+                    ]
+                )
+                results = dict(zip(symbols, frames))
+            else:
+                fetched = await self._fetch_crypto_batches(
+                    symbols, start_date, end_date, frequency, limited, priority
+                )
+                # Reading the cache and writing the store are file I/O, kept off the loop
+                frames = await asyncio.gather(
+                    *[
+                        limited(
+                            self._read_cache,
+                            symbol,
+                            frequency,
+                            start_date,
+                            end_date,
+                            fetched.get(symbol),
+                        )
+                        for symbol in symbols
+                    ]
+                )
+                results = dict(zip(symbols, frames))
+        finally:
+            executor.shutdown(wait=False)
+
+        if not long_format:
+            return results
+        frames = [
+            df.assign(asset=symbol) for symbol, df in results.items() if not df.empty
+        ]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    # pylint: disable=too-many-arguments
+    async def _fetch_crypto_batches(
+        self, symbols, start_date, end_date, frequency, limited, priority
+    ):
+        """
+        Fill the cache gaps of many crypto symbols with batched requests.
+
+        The cache is read and written in the executor, keeping file I/O off the
+        event loop.
+
+        :return: Dict of each symbol to the frame of bars fetched for it.
+        """
+        batches = await limited(
+            self._crypto_batches, symbols, start_date, end_date, frequency
+        )
+        if not batches:
+            return {}
+        print(f"Fetching {len(symbols)} crypto symbols in {len(batches)} request(s)...")
+        responses = await asyncio.gather(
+            *[
+                limited(self._request_crypto_batch, batch, *chunk, frequency, priority)
+                for chunk, batch in batches
+            ]
+        )
+        return await limited(self._merge_crypto_batches, batches, responses, frequency)
+
+    def _crypto_batches(self, symbols, start_date, end_date, frequency):
+        """List the (chunk, symbols) requests that fill the cache gaps of symbols."""
+        # Group the symbols by the chunks they are missing so each chunk is
+        # requested once for a whole batch of tickers
+        symbols_by_chunk = defaultdict(list)
+        for symbol in symbols:
+            for gap in self.cache.missing_ranges(
+                symbol, frequency, start_date, end_date
+            ):
+                for chunk in self._split_range(*gap, frequency):
+                    symbols_by_chunk[chunk].append(symbol)
+
+        return [
+            (chunk, chunk_symbols[i : i + CRYPTO_BATCH_SIZE])
+            for chunk, chunk_symbols in symbols_by_chunk.items()
+            for i in range(0, len(chunk_symbols), CRYPTO_BATCH_SIZE)
+        ]
+
+    def _merge_crypto_batches(self, batches, responses, frequency):
+        """
+        Merge the responses of batched crypto requests into the cache.
+
+        :return: Dict of each symbol to the frame of bars fetched for it.
+        """
+        # Merge each symbol once with every chunk that was fetched for it
+        fetched = defaultdict(list)
+        for (chunk, batch), prices in zip(batches, responses):
+            if prices is None:
+                continue  # Leave the chunk uncovered so it is retried next time
+            for symbol in batch:
+                fetched[symbol].append((chunk, prices.get(symbol.lower())))
+        fetched_bars = {}
+        for symbol, chunks in fetched.items():
+            frames = [df for _, df in chunks if df is not None and not df.empty]
+            fetched_bars[symbol] = (
+                pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            )
+            self.cache.merge(
+                symbol, frequency, fetched_bars[symbol], [chunk for chunk, _ in chunks]
+            )
+        return fetched_bars
 
     def _normalize_tiingo_data(self, data, asset_name):
         """Normalize Tiingo stock data to match the required schema."""
@@ -1,51 +1,202 @@
 import argparse
+import csv
+import io
+import os
+import time
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import csv as pa_csv
+
+# Delimiters and date formats tried when sniffing a sample of the input file
+CANDIDATE_DELIMITERS = ",;\t|"
+CANDIDATE_DATE_FORMATS = [
+    "ISO8601",
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M",
+    "%d.%m.%Y",
+]
+CSV_ENGINES = ["c", "pyarrow"]
 
 
 class CSVStandardizer:
     """
     A class for standardizing CSV files by cleaning and fixing common issues,
     such as inconsistent separators, date parsing, and handling missing values.
+
+    Files are processed in chunks, so memory use is bounded by the chunk size
+    rather than the size of the input file.
     """
 
+    @staticmethod
+    def sniff_format(
+        file_path: str,
+        date_column: str = None,  # type: ignore
+        sample_bytes: int = 1 << 16,
+    ) -> dict:
+        """
+        Detect the delimiter, encoding and date format of a CSV file from a sample.
+
+        :param file_path: Path to the input CSV file.
+        :param date_column: Name of the date column whose format should be detected.
+        :param sample_bytes: Size of the sample read from the start of the file.
+        :return: Dict with 'delimiter', 'encoding', 'date_format' (None if the
+            dates have no single known format and must be inferred) and
+            'numeric_columns', the columns whose sampled values are all numbers.
+        """
+        with open(file_path, "rb") as file:
+            raw_sample = file.read(sample_bytes)
+        encoding = "utf-8-sig" if raw_sample.startswith(b"\xef\xbb\xbf") else "utf-8"
+        sample = raw_sample.decode(encoding, errors="ignore")
+        # Drop the last, possibly truncated, line
+        lines = sample.splitlines()[:-1] or sample.splitlines()
+
+        try:
+            delimiter = (
+                csv.Sniffer()
+                .sniff("\n".join(lines), delimiters=CANDIDATE_DELIMITERS)
+                .delimiter
+            )
+        except csv.Error:
+            delimiter = ","
+
+        sample_data = pd.read_csv(
+            io.StringIO("\n".join(lines)), sep=delimiter, dtype=str
+        )
+        sample_data.columns = sample_data.columns.str.strip()
+        numeric_columns = []
+        for column in sample_data.columns:
+            values = sample_data[column].dropna()
+            if (
+                column != date_column
+                and len(values)
+                and pd.to_numeric(values, errors="coerce").notna().all()
+            ):
+                numeric_columns.append(column)
+
+        date_format = None
+        if date_column:
+            if date_column not in sample_data.columns:
+                raise ValueError(f"Date column '{date_column}' not found in the data.")
+            values = sample_data[date_column].dropna()
+            for candidate in CANDIDATE_DATE_FORMATS:
+                try:
+                    pd.to_datetime(values, format=candidate)
+                except (ValueError, TypeError):
+                    continue
+                date_format = candidate
+                break
+
+        return {
+            "delimiter": delimiter,
+            "encoding": encoding,
+            "date_format": date_format,
+            "numeric_columns": numeric_columns,
+        }
+
+    # pylint: disable=too-many-arguments,too-many-locals
     @staticmethod
     def fix_csv(
-        file_path: str, output_path: str, date_column: str = None  # type: ignore
-    ) -> pd.DataFrame:
+        file_path: str,
+        output_path: str,
+        date_column: str = None,  # type: ignore
+        chunksize: int = 200_000,
+        engine: str = "c",
+        progress: bool = False,
+    ) -> dict:
         """
         Load and clean a poorly structured CSV and output it in a standard format.
 
+        The delimiter and date format are sniffed from a sample, then the file is
+        cleaned chunk by chunk and written out incrementally, as Parquet if the
+        output path ends in '.parquet' and as comma-separated CSV otherwise. Only
+        one chunk is held in memory at a time.
+
+        Values that are not numbers in columns that are numeric in the sample
+        count as missing, so their rows are dropped. In Parquet output, numeric
+        columns are stored as float64 and other columns except the dates as
+        strings, so every chunk has the same schema.
+
         :param file_path: Path to the input CSV file.
-        :param output_path: Path where the cleaned CSV will be saved.
+        :param output_path: Path where the cleaned CSV or Parquet file will be saved.
         :param date_column: Name of the date column to parse as datetime.
-        :return: Cleaned pandas DataFrame.
+        :param chunksize: Number of rows processed at a time.
+        :param engine: 'c' to parse with pandas' C parser, 'pyarrow' for pyarrow's
+            streaming CSV reader.
+        :param progress: Print progress and throughput while processing.
+        :return: Dict with the 'output_path', the 'rows_in' read, the 'rows_out'
+            written and the 'seconds' taken, or None if the file could not be
+            cleaned.
         """
         try:
-            # Try to load the CSV with semicolon separator
-            data = pd.read_csv(file_path, sep=";", engine="python")
-
-            # If a date column is specified, parse it
-            if date_column:
-                if date_column in data.columns:
-                    data[date_column] = pd.to_datetime(
-                        data[date_column], errors="coerce"
-                    )  # Parse dates and handle errors
-                else:
-                    raise ValueError(
-                        f"Date column '{date_column}' not found in the data."
-                    )
-
-            # Remove leading/trailing spaces from column names
-            data.columns = data.columns.str.strip()
-
-            # Handle missing values by dropping rows with NaN values
-            data = data.dropna()
-
-            # Save the cleaned CSV to the specified output path
-            data.to_csv(output_path, index=False)
-            print(f"CSV file has been cleaned and saved to {output_path}")
-            return data
+            if engine not in CSV_ENGINES:
+                raise ValueError(
+                    f"Unsupported engine: {engine}. Supported engines: {CSV_ENGINES}"
+                )
+            file_format = CSVStandardizer.sniff_format(file_path, date_column)
+            total_bytes = os.path.getsize(file_path)
+            to_parquet = output_path.endswith(".parquet")
+
+            rows_in = rows_out = 0
+            writer = None
+            start = time.perf_counter()
+            with open(file_path, "rb") as source:
+                try:
+                    for chunk in _iter_chunks(source, file_format, chunksize, engine):
+                        rows_in += len(chunk)
+                        chunk = _clean_chunk(
+                            chunk,
+                            date_column,
+                            file_format["date_format"],
+                            file_format["numeric_columns"],
+                        )
+                        rows_out += len(chunk)
+
+                        # Write the cleaned chunk to the output file incrementally
+                        if to_parquet:
+                            table = pa.Table.from_pandas(
+                                _parquet_types(chunk, file_format["numeric_columns"]),
+                                preserve_index=False,
+                            )
+                            if writer is None:
+                                writer = pq.ParquetWriter(output_path, table.schema)
+                            writer.write_table(table.cast(writer.schema))
+                        else:
+                            chunk.to_csv(
+                                output_path,
+                                mode="w" if writer is None else "a",
+                                header=writer is None,
+                                index=False,
+                            )
+                            writer = writer or output_path
+
+                        if progress:
+                            elapsed = time.perf_counter() - start
+                            print(
+                                f"Processed {rows_in:,} rows "
+                                f"({min(source.tell() / total_bytes, 1):.0%}) "
+                                f"at {rows_in / elapsed:,.0f} rows/sec"
+                            )
+                finally:
+                    if to_parquet and writer is not None:
+                        writer.close()
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"CSV file has been cleaned and saved to {output_path} "
+                f"({rows_out:,} of {rows_in:,} rows kept, {rows_in / max(elapsed, 1e-9):,.0f} rows/sec)"
+            )
+            return {
+                "output_path": output_path,
+                "rows_in": rows_in,
+                "rows_out": rows_out,
+                "seconds": elapsed,
+            }
 
         except pd.errors.ParserError as pe:
             print(f"Parser error while processing the CSV file: {pe}")
@@ -62,23 +213,106 @@ class CSVStandardizer:
             return None  # type: ignore
 
 
+def _iter_chunks(source, file_format, chunksize, engine):
+    """Yield the rows of an open CSV file as frames of at most chunksize rows."""
+    if engine == "pyarrow":
+        reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(encoding=file_format["encoding"]),
+            parse_options=pa_csv.ParseOptions(delimiter=file_format["delimiter"]),
+        )
+        for batch in reader:
+            frame = batch.to_pandas()
+            for offset in range(0, len(frame), chunksize):
+                yield frame.iloc[offset : offset + chunksize]
+        return
+
+    yield from pd.read_csv(
+        source,
+        sep=file_format["delimiter"],
+        encoding=file_format["encoding"],
+        engine="c",
+        chunksize=chunksize,
+    )
+
+
+def _clean_chunk(chunk, date_column, date_format, numeric_columns=()):
+    """Apply the standard cleaning steps to one chunk of rows."""
+    # Remove leading/trailing spaces from column names
+    chunk.columns = chunk.columns.str.strip()
+
+    # Stray values in numeric columns become missing values
+    for column in numeric_columns:
+        if column in chunk.columns:
+            chunk[column] = pd.to_numeric(chunk[column], errors="coerce")
+
+    # If a date column is specified, parse it
+    if date_column:
+        if date_column not in chunk.columns:
+            raise ValueError(f"Date column '{date_column}' not found in the data.")
+        chunk[date_column] = pd.to_datetime(
+            chunk[date_column], format=date_format, errors="coerce"
+        )  # Parse dates and handle errors
+
+    # Handle missing values by dropping rows with NaN values
+    return chunk.dropna()
+
+
+def _parquet_types(chunk, numeric_columns):
+    """
+    Cast a cleaned chunk to the column types of the Parquet output: float64 for
+    numeric columns and strings for the others except datetimes, so a column
+    that is integral in one chunk and fractional or textual in another does not
+    change the schema.
+    """
+    columns = {}
+    for column in chunk.columns:
+        values = chunk[column]
+        if column in numeric_columns:
+            values = values.astype("float64")
+        elif not pd.api.types.is_datetime64_any_dtype(values):
+            values = values.astype(str)
+        columns[column] = values
+    return pd.DataFrame(columns, index=chunk.index)
+
+
 if __name__ == "__main__":
     # Parse command-line arguments
     parser = argparse.ArgumentParser(
         description="Clean a CSV file and output it in a standard format."
     )
     parser.add_argument("input_file", help="Path to the input CSV file")
-    parser.add_argument("output_file", help="Path to save the cleaned CSV file")
+    parser.add_argument(
+        "output_file",
+        help="Path to save the cleaned file, written as Parquet if it ends in .parquet",
+    )
     parser.add_argument(
         "--date_column",
         help="Name of the date column to parse as datetime",
         default=None,
     )
+    parser.add_argument(
+        "--chunksize",
+        help="Number of rows processed at a time",
+        type=int,
+        default=200_000,
+    )
+    parser.add_argument(
+        "--engine",
+        help="CSV parser to use",
+        choices=CSV_ENGINES,
+        default="c",
+    )
 
     args = parser.parse_args()
 
     # Run the CSV cleaning process
     csv_cleaner = CSVStandardizer()
-    cleaned_data = csv_cleaner.fix_csv(
-        args.input_file, args.output_file, date_column=args.date_column
+    csv_cleaner.fix_csv(
+        args.input_file,
+        args.output_file,
+        date_column=args.date_column,
+        chunksize=args.chunksize,
+        engine=args.engine,
+        progress=True,
     )
@@ -0,0 +1,26 @@
+import argparse
+
+from data.tiingo_data_fetcher import DataFetcher
+
+if __name__ == "__main__":
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(
+        description="Import per-request Tiingo cache files into the canonical cached series."
+    )
+    parser.add_argument(
+        "--cache_folder",
+        help="Folder containing the cached Tiingo files",
+        default="data/sets",
+    )
+    parser.add_argument(
+        "--remove_legacy",
+        help="Delete each legacy file once it has been imported",
+        action="store_true",
+    )
+
+    args = parser.parse_args()
+
+    # Run the migration
+    fetcher = DataFetcher(cache_folder=args.cache_folder)
+    imported_files = fetcher.migrate_legacy_cache(remove_legacy=args.remove_legacy)
+    print(f"Imported {len(imported_files)} file(s).")
@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+# Bar lengths of the Tiingo resample frequencies served by the replay server
+FREQUENCY_OFFSETS = {
+    "daily": "1D",
+    "weekly": "7D",
+    "monthly": "30D",
+    "annually": "365D",
+}
+
+
+def synthetic_ohlcv(rows, freq="1min", start="2020-01-01", seed=42):
+    """Generate a random-walk OHLCV frame in the normalized Tiingo schema."""
+    rng = np.random.default_rng(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 1, rows))
+    spread = np.abs(rng.normal(0, 0.5, rows))
+    return pd.DataFrame(
+        {
+            "date": pd.date_range(start=start, periods=rows, freq=freq, tz="UTC"),
+            "open": close + rng.normal(0, 0.2, rows),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1, 1000, rows),
+        }
+    )
+
+
+def _bar_length(frequency):
+    """Convert a Tiingo resample frequency such as '5min' or '4hour' to a Timedelta."""
+    offset = FREQUENCY_OFFSETS.get(frequency, frequency)
+    return pd.Timedelta(offset.replace("hour", "h").replace("day", "D"))
+
+
+class TiingoReplayServer:
+    """
+    A local stand-in for the Tiingo price endpoints.
+
+    Serves /tiingo/daily/<sym>/prices and /tiingo/crypto/prices from recorded
+    responses or synthetic bars, with configurable latency, error injection and
+    rate limiting. Point the fetcher at it through DataFetcher(base_url=...) or
+    the TIINGO_BASE_APIURL environment variable.
+
+    Recorded responses are looked up in record_dir as '<symbol>_<frequency>'
+    files, either Tiingo JSON or the Parquet/CSV series written by the data cache,
+    so a populated cache folder can be replayed directly.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        record_dir=None,
+        synthetic=True,
+        latency=0.0,
+        latency_jitter=0.0,
+        bar_latency=0.0,
+        error_rate=0.0,
+        requests_per_second=None,
+        seed=42,
+    ):
+        self.record_dir = record_dir
+        self.synthetic = synthetic
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.bar_latency = bar_latency
+        self.error_rate = error_rate
+        self.requests_per_second = requests_per_second
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "bars": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # Bucket capacity, so bursts of up to one second of requests are allowed
+        self._capacity = max(1.0, requests_per_second or 0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests on the current thread until interrupted."""
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        """Stop the server and release its port."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _take_token(self):
+        """Token bucket refilled at requests_per_second, returns the seconds to wait."""
+        if not self.requests_per_second:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._updated) * self.requests_per_second,
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.requests_per_second
+
+    def _load_recording(self, symbol, frequency):
+        """Return the recorded bars of a symbol as a frame, or None."""
+        if self.record_dir is None:
+            return None
+        base = os.path.join(self.record_dir, f"{symbol.lower()}_{frequency}")
+        if os.path.exists(f"{base}.json"):
+            with open(f"{base}.json", "r", encoding="utf-8") as file:
+                return pd.DataFrame(json.load(file))
+        if os.path.exists(f"{base}.parquet"):
+            return pd.read_parquet(f"{base}.parquet")
+        if os.path.exists(f"{base}.csv"):
+            return pd.read_csv(f"{base}.csv")
+        return None
+
+    def price_data(self, symbol, start_date, end_date, frequency):
+        """Bars of a symbol between two inclusive dates as Tiingo JSON records."""
+        start = pd.Timestamp(start_date, tz="UTC")
+        end = pd.Timestamp(end_date, tz="UTC") + pd.Timedelta(days=1)
+
+        bars = self._load_recording(symbol, frequency)
+        if bars is not None:
+            bars["date"] = pd.to_datetime(bars["date"], utc=True)
+            bars = bars[(bars["date"] >= start) & (bars["date"] < end)].copy()
+        elif self.synthetic:
+            bar_length = _bar_length(frequency)
+            seed = zlib.crc32(f"{symbol}{start_date}{frequency}".encode())
+            bars = synthetic_ohlcv(
+                int((end - start) / bar_length),
+                freq=bar_length,
+                start=start.strftime("%Y-%m-%d"),
+                seed=seed,
+            )
+        else:
+            return []
+
+        bars["date"] = bars["date"].dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        return bars.to_dict("records")
+
+    def _make_handler(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            """Answers Tiingo price requests on behalf of the replay server."""
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                with server._lock:  # pylint: disable=protected-access
+                    server.stats["requests"] += 1
+                    fail = server._random.random() < server.error_rate
+
+                wait = server._take_token()  # pylint: disable=protected-access
+                if wait > 0:
+                    with server._lock:  # pylint: disable=protected-access
+                        server.stats["rate_limited"] += 1
+                    self._send_json(
+                        429,
+                        {"detail": "Rate limit exceeded"},
+                        {"Retry-After": f"{wait:.3f}"},
+                    )
+                    return
+                if fail:
+                    with server._lock:  # pylint: disable=protected-access
+                        server.stats["errors"] += 1
+                    self._send_json(503, {"detail": "Injected error"})
+                    return
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+                try:
+                    args = (
+                        query["startDate"][0],
+                        query["endDate"][0],
+                        query.get("resampleFreq", ["daily"])[0],
+                    )
+                    if url.path == "/tiingo/crypto/prices":
+                        payload = [
+                            {
+                                "ticker": ticker.lower(),
+                                "priceData": server.price_data(ticker, *args),
+                            }
+                            for ticker in query["tickers"][0].split(",")
+                        ]
+                        bars = sum(len(item["priceData"]) for item in payload)
+                    elif parts[:2] == ["tiingo", "daily"] and parts[-1] == "prices":
+                        payload = server.price_data(parts[2], *args)
+                        bars = len(payload)
+                    else:
+                        self._send_json(404, {"detail": "Not found"})
+                        return
+                except (KeyError, IndexError, ValueError) as e:
+                    self._send_json(400, {"detail": f"Bad request: {e}"})
+                    return
+
+                with server._lock:  # pylint: disable=protected-access
+                    server.stats["bars"] += bars
+                    jitter = server._random.uniform(0, server.latency_jitter)
+                time.sleep(server.latency + jitter + server.bar_latency * bars)
+                self._send_json(200, payload)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+        return ReplayHandler
+
+
+if __name__ == "__main__":
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(
+        description="Serve recorded or synthetic Tiingo price responses locally."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--record_dir",
+        help="Folder of recorded '<symbol>_<frequency>' JSON/Parquet/CSV files, e.g. data/sets",
+        default=None,
+    )
+    parser.add_argument(
+        "--no_synthetic",
+        help="Return no bars for symbols without a recording",
+        action="store_true",
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency_jitter", type=float, default=0.0)
+    parser.add_argument("--bar_latency", type=float, default=0.0)
+    parser.add_argument("--error_rate", type=float, default=0.0)
+    parser.add_argument("--requests_per_second", type=float, default=None)
+
+    args = parser.parse_args()
+
+    replay_server = TiingoReplayServer(
+        host=args.host,
+        port=args.port,
+        record_dir=args.record_dir,
+        synthetic=not args.no_synthetic,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        bar_latency=args.bar_latency,
+        error_rate=args.error_rate,
+        requests_per_second=args.requests_per_second,
+    )
+    print(f"Serving Tiingo replays on {replay_server.base_url}")
+    print(f"Run with TIINGO_BASE_APIURL={replay_server.base_url} to use it.")
+    replay_server.serve_forever()
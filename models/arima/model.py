@@ -25,14 +25,9 @@ class ArimaModel(Model):
         """Train ARIMA model on the 'close' prices"""
         close_prices = data["close"]
 
-        # Set proper datetime index or reset the index if dates are available
+        # Resample the close prices to the configured interval if dates are available
         if "date" in data.columns:
-            close_prices = pd.Series(
-                close_prices.values, index=pd.to_datetime(data["date"])
-            )  # Set the index with a datetime index
-
-            # Resample the data to the configured interval
-            close_prices = resample_data(self, close_prices)
+            close_prices = resample_data(self, data)
 
         # Perform stationarity check and differencing if necessary
         p_value = adf_test(close_prices)
@@ -67,13 +62,8 @@ class ArimaModel(Model):
                 "Model is not trained. Please train the model before calling forecast."
             )
 
-        close_prices = input_data["close"]
-
         # Resample the input data to the desired interval
-        close_prices = pd.Series(
-            close_prices.values, index=pd.to_datetime(input_data["date"])
-        )
-        close_prices = resample_data(self, close_prices)
+        close_prices = resample_data(self, input_data)
 
         # Forecast the number of steps equal to the length of the input data
         predictions = self.model.forecast(steps=len(close_prices))
@@ -3,6 +3,8 @@ import pandas as pd
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.stattools import adfuller
 
+from utils.ohlcv_pyramid import get_pyramid
+
 
 def adf_test(series):
     """Perform ADF test to check stationarity"""
@@ -15,9 +17,9 @@ def differencing(series):
     return series.diff().dropna()
 
 
-def resample_data(self, data: pd.Series) -> pd.Series:
-    """Resample the data to the desired interval"""
-    return data.resample(self.config.interval).mean()
+def resample_data(self, data: pd.DataFrame) -> pd.Series:
+    """Read the close prices at the desired interval from the data's OHLCV pyramid"""
+    return get_pyramid(data).resample(self.config.interval)["close"]
 
 
 def grid_search_arima(self, data: pd.Series, p_values, d_values, q_values):
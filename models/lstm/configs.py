@@ -12,15 +12,37 @@ class LstmConfig:
         # Model architecture parameters
         self.input_size = 1  # Input size (number of features)
         self.hidden_size = 64  # Number of LSTM units per layer
-        self.output_size = 1  # Output size (prediction dimension)
+        # Output size: intervals predicted at once, the horizon that forecast()
+        # covers in a single forward pass
+        self.output_size = 1
         self.num_layers = 2  # Number of stacked LSTM layers
         self.dropout = 0.5  # Dropout probability for regularization
+        # Size of the learned symbol embedding of global models trained with
+        # train_many(), 0 for none
+        self.symbol_embedding_size = 0
 
         # Training parameters
         self.learning_rate = 0.0001  # Learning rate for the optimizer
         self.batch_size = 32  # Batch size for training
         self.epochs = 100  # Number of training epochs
         self.early_stopping_patience = 10  # Early stopping patience in epochs
+        self.eval_batch_size = 256  # Windows per forward pass when evaluating
+
+        # Fine-tuning on newly arrived data
+        self.fine_tune_epochs = 5  # Epochs of each fine_tune() call
+        self.fine_tune_window = 500  # Most recent windows to fine-tune on
+        self.fine_tune_replay = 500  # Older windows replayed against forgetting
+        self.fine_tune_learning_rate = None  # None keeps the checkpoint's rate
+
+        # CPU performance
+        self.num_threads = None  # Intra-op threads, None keeps torch's default
+        self.num_interop_threads = None  # Inter-op threads, None keeps the default
+        self.compile = False  # Train a torch.compile'd version of the LSTM
+        self.bf16 = False  # Train with bfloat16 autocast on CPU
+        self.quantize = False  # Run inference and forecast on an int8 dynamic copy
+
+        # Uncertainty
+        self.mc_samples = 100  # Dropout samples of forecast() quantile bands
 
         # Data processing
         self.validation_split = 0.2  # Proportion of data used for validation
@@ -37,10 +59,22 @@ class LstmConfig:
         print(f"  Output Size: {self.output_size}")
         print(f"  Num Layers: {self.num_layers}")
         print(f"  Dropout: {self.dropout}")
+        print(f"  Symbol Embedding Size: {self.symbol_embedding_size}")
         print(f"  Learning Rate: {self.learning_rate}")
         print(f"  Batch Size: {self.batch_size}")
         print(f"  Epochs: {self.epochs}")
         print(f"  Early Stopping Patience: {self.early_stopping_patience}")
+        print(f"  Eval Batch Size: {self.eval_batch_size}")
+        print(f"  Fine-tune Epochs: {self.fine_tune_epochs}")
+        print(f"  Fine-tune Window: {self.fine_tune_window}")
+        print(f"  Fine-tune Replay: {self.fine_tune_replay}")
+        print(f"  Fine-tune Learning Rate: {self.fine_tune_learning_rate}")
+        print(f"  Num Threads: {self.num_threads}")
+        print(f"  Num Inter-op Threads: {self.num_interop_threads}")
+        print(f"  Compile: {self.compile}")
+        print(f"  BF16: {self.bf16}")
+        print(f"  Quantize: {self.quantize}")
+        print(f"  MC Samples: {self.mc_samples}")
         print(f"  Validation Split: {self.validation_split}")
         print(f"  Time Steps: {self.time_steps}")
         print(f"  Interval: {self.interval}")
@@ -1,13 +1,28 @@
+import json
+import os
+import time
+import warnings
+from typing import Optional, Tuple
+
 import numpy as np
 import pandas as pd
 import torch
 from sklearn.preprocessing import MinMaxScaler
 from torch import nn
 from torch.optim.adam import Adam
-from torch.utils.data import DataLoader, TensorDataset
 
 from models.base_model import Model
 from models.lstm.configs import LstmConfig
+from models.lstm.utils import (
+    LstmForecaster,
+    LstmStateCache,
+    SymbolWindowDataset,
+    WindowBatcher,
+    WindowDataset,
+    mc_dropout,
+)
+from utils.common import print_colored
+from utils.ohlcv_pyramid import get_pyramid
 
 
 # Define the LSTM architecture
@@ -15,11 +30,30 @@ class LSTM(nn.Module):
     """LSTM based model for time series forecasting"""
 
     # pylint: disable=too-many-arguments
-    def __init__(self, input_size, hidden_size, output_size, num_layers, dropout=0.5):
+    def __init__(
+        self,
+        input_size,
+        hidden_size,
+        output_size,
+        num_layers,
+        dropout=0.5,
+        num_symbols=0,
+        embedding_size=0,
+    ):
         super().__init__()
         self.hidden_size = hidden_size
         self.num_layers = num_layers
 
+        # Learned embedding of the symbol of each series, appended to every
+        # timestep of global models trained on many symbols
+        self.symbol_embedding = (
+            nn.Embedding(num_symbols, embedding_size)
+            if num_symbols and embedding_size
+            else None
+        )
+        if self.symbol_embedding is not None:
+            input_size += embedding_size
+
         # Define the LSTM layers
         self.lstm = nn.LSTM(
             input_size, hidden_size, num_layers, batch_first=True, dropout=dropout
@@ -28,15 +62,29 @@ class LSTM(nn.Module):
         self.batch_norm = nn.BatchNorm1d(hidden_size)  # Batch normalization layer
         self.dropout = nn.Dropout(dropout)  # Dropout layer for regularization
 
-    def forward(self, x, hidden_state=None):
+    def forward(
+        self,
+        x,
+        hidden_state: Optional[Tuple[torch.Tensor, torch.Tensor]] = None,
+        symbols: Optional[torch.Tensor] = None,
+    ) -> Tuple[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+        # Append the embedding of each series' symbol to all of its timesteps
+        if self.symbol_embedding is not None:
+            if symbols is None:
+                raise ValueError("This LSTM has a symbol embedding and needs symbols.")
+            embedded = self.symbol_embedding(symbols).unsqueeze(1)
+            x = torch.cat((x, embedded.expand(-1, x.size(1), -1)), dim=2)
+
         # Initialize hidden and cell states if not provided
         if hidden_state is None:
             h0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size).to(x.device)
             c0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size).to(x.device)
-            hidden_state = (h0, c0)
+            initial_state = (h0, c0)
+        else:
+            initial_state = hidden_state
 
         # Forward pass through LSTM
-        out, hidden_state = self.lstm(x, hidden_state)
+        out, hidden_state = self.lstm(x, initial_state)
 
         # Apply batch normalization and dropout on the output
         out = self.batch_norm(out[:, -1, :])  # Normalize across the last time step
@@ -46,6 +94,34 @@ class LSTM(nn.Module):
         out = self.fc(out)
         return out, hidden_state
 
+    def step(self, x, hidden_state):
+        """
+        Inference on a single timestep, updating the hidden state in place.
+
+        Runs the layers one fused LSTM cell at a time, which skips the fixed
+        overhead of nn.LSTM on one-step sequences. In eval mode it gives the same
+        output as forward() on a sequence of length one.
+
+        :param x: Input of shape (batch, input_size).
+        :param hidden_state: Tuple of (h, c) of shape (num_layers, batch, hidden_size).
+        :return: Output of shape (batch, output_size).
+        """
+        h, c = hidden_state
+        out = x
+        for layer in range(self.num_layers):
+            h_layer, c_layer = torch.lstm_cell(
+                out,
+                (h[layer], c[layer]),
+                getattr(self.lstm, f"weight_ih_l{layer}"),
+                getattr(self.lstm, f"weight_hh_l{layer}"),
+                getattr(self.lstm, f"bias_ih_l{layer}"),
+                getattr(self.lstm, f"bias_hh_l{layer}"),
+            )
+            h[layer].copy_(h_layer)
+            c[layer].copy_(c_layer)
+            out = h_layer
+        return self.fc(self.dropout(self.batch_norm(out)))
+
 
 # Define the LSTM model class that integrates with the base model
 class LstmModel(Model):
@@ -54,95 +130,170 @@ class LstmModel(Model):
     def __init__(self, model_name="lstm", config=LstmConfig(), debug=False):
         super().__init__(model_name=model_name, model_type="pytorch", debug=debug)
         self.config = config  # Use the configuration class
+        self.criterion = nn.MSELoss()
+
+        # Symbols of a global model trained with train_many, in embedding order
+        self.symbols = []
+        self._build_model()
+
+        # Loss, seconds and throughput of each epoch of the last training
+        self.training_history = []
+        # Epochs trained since the model was built, resumed from checkpoints
+        self.epochs_trained = 0
+
+        # Int8 copy of the model for inference, see _inference_model
+        self._quantized_model = None
+
+        # States of the symbols streamed through stream_inference
+        self.state_cache = LstmStateCache(
+            num_layers=self.config.num_layers, hidden_size=self.config.hidden_size
+        )
+
+    def _build_model(self, num_symbols=0):
+        """
+        Build a new LSTM and its optimizer, with an embedding of num_symbols
+        symbols if config.symbol_embedding_size is set.
+        """
         self.model = LSTM(
             input_size=self.config.input_size,
             hidden_size=self.config.hidden_size,
             output_size=self.config.output_size,
             num_layers=self.config.num_layers,
             dropout=self.config.dropout,
+            num_symbols=num_symbols,
+            embedding_size=self.config.symbol_embedding_size,
         )
-        self.criterion = nn.MSELoss()
-
         self.optimizer = Adam(
             self.model.parameters(),
             lr=self.config.learning_rate,
         )
 
-    # pylint: disable=too-many-locals,too-many-statements
-    def train(self, data: pd.DataFrame):
-        # Initialize the scaler
-        scaler = MinMaxScaler(feature_range=(0, 1))
-
-        # Ensure the 'date' column is a DatetimeIndex for resampling
-        if "date" in data.columns:
-            data["date"] = pd.to_datetime(data["date"])
-            data = data.set_index("date")
+    def _use_symbols(self, symbols):
+        """
+        Make the model a global model of symbols, rebuilding it if its symbol
+        embedding does not match them.
+        """
+        embedding = self.model.symbol_embedding
+        num_symbols = len(symbols) if self.config.symbol_embedding_size else 0
+        if (0 if embedding is None else embedding.num_embeddings) != num_symbols:
+            self._build_model(num_symbols)
+        self.symbols = list(symbols)
+
+    def _symbol_ids(self, symbols):
+        """
+        Embedding ids of symbols as a tensor, or None if the model has no symbol
+        embedding.
+        """
+        if self.model.symbol_embedding is None:
+            return None
+        ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        unknown = [symbol for symbol in symbols if symbol not in ids]
+        if unknown:
+            raise ValueError(
+                f"Symbols {unknown} were not trained. Trained symbols: {self.symbols}"
+            )
+        return torch.tensor([ids[symbol] for symbol in symbols], dtype=torch.long)
 
-        # Select only numeric columns for resampling
-        numeric_data = data.select_dtypes(include=[np.number])  # type: ignore
+    def _scaled_closes(self, data: pd.DataFrame):
+        """
+        Min-max scale the closes of data at the configured interval.
 
-        # Resample the data based on the configured interval
-        numeric_data = numeric_data.resample(self.config.interval).mean().dropna()
+        :return: Tuple of (fitted scaler, 1D float32 tensor of the scaled closes).
+        """
+        scaler = MinMaxScaler(feature_range=(0, 1))
 
-        # Reattach the non-numeric data (e.g., 'asset' column) after resampling if needed
-        if "asset" in data.columns:
-            asset_data = data[["asset"]].resample(self.config.interval).first()
-            data = numeric_data.join(asset_data)
-        else:
-            data = numeric_data
+        # Read the configured interval from the shared OHLCV pyramid of the data
+        data = get_pyramid(data).resample(self.config.interval)
 
         # Normalize the data
         close_prices = data["close"].values.astype(float).reshape(-1, 1)
         scaled_close_prices = scaler.fit_transform(close_prices)
-
-        # Prepare data with normalized prices
-        train_data = self._prepare_data(scaled_close_prices)
-        x_train, y_train = train_data[:-1], train_data[1:]
-
-        # Split data into training and validation sets
-        val_size = int(len(x_train) * self.config.validation_split)
-        x_train, x_val = x_train[:-val_size], x_train[-val_size:]
-        y_train, y_val = y_train[:-val_size], y_train[-val_size:]
-
-        # Convert to tensors
-        x_train = torch.tensor(x_train, dtype=torch.float32).unsqueeze(-1)
-        y_train = torch.tensor(y_train[:, -1], dtype=torch.float32).unsqueeze(-1)
-        x_val = torch.tensor(x_val, dtype=torch.float32).unsqueeze(-1)
-        y_val = torch.tensor(y_val[:, -1], dtype=torch.float32).unsqueeze(-1)
-
-        # Create DataLoader for mini-batching
-        train_dataset = TensorDataset(x_train, y_train)
-        train_loader = DataLoader(
-            train_dataset, batch_size=self.config.batch_size, shuffle=True
+        return scaler, torch.from_numpy(scaled_close_prices.ravel().astype(np.float32))
+
+    def _scaled_windows(self, data: pd.DataFrame):
+        """
+        Min-max scale the closes of data at the configured interval and view them
+        as windows that predict the next output_size intervals.
+
+        :return: Tuple of (fitted scaler, WindowDataset of the scaled closes).
+        """
+        scaler, scaled_closes = self._scaled_closes(data)
+
+        # Windows of the normalized prices, viewed lazily from one tensor
+        dataset = WindowDataset(
+            scaled_closes,
+            min(
+                self.config.time_steps,
+                len(scaled_closes) - self.config.output_size,
+            ),
+            horizon=self.config.output_size,
         )
-
+        return scaler, dataset
+
+    def _train_epoch(self, train_model, train_loader):
+        """Run one epoch of optimizer steps and return the summed batch losses."""
+        epoch_loss = 0
+        # Batches of global models also hold the symbol id of each window
+        for inputs, targets, *symbols in train_loader:
+            with torch.autocast("cpu", dtype=torch.bfloat16, enabled=self.config.bf16):
+                outputs, _ = train_model(inputs, None, *symbols)  # Get only the output
+                loss = self.criterion(outputs.float(), targets)
+            self.optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(
+                self.model.parameters(), max_norm=1.0
+            )  # Gradient clipping
+            self.optimizer.step()
+            epoch_loss += loss.item()
+        return epoch_loss
+
+    def _fit(self, train_loader, val_loader, train_size, val_size):
+        """
+        Train for up to config.epochs with early stopping on the validation loss,
+        recording each epoch in training_history.
+        """
         best_val_loss = float("inf")
         patience_counter = 0
 
+        # Apply the configured CPU threading, compilation and precision
+        train_model = self._configure_training()
+        self.training_history = []
+        self.epochs_trained = 0
+
         self.model.train()
         for epoch in range(self.config.epochs):
-            epoch_loss = 0
-            for inputs, targets in train_loader:
-                outputs, _ = self.model(inputs)  # Get only the output
-                loss = self.criterion(outputs, targets)
-                self.optimizer.zero_grad()
-                loss.backward()
-                torch.nn.utils.clip_grad_norm_(
-                    self.model.parameters(), max_norm=1.0
-                )  # Gradient clipping
-                self.optimizer.step()
-                epoch_loss += loss.item()
+            epoch_start = time.perf_counter()
+            epoch_loss = self._train_epoch(train_model, train_loader)
+            self.epochs_trained += 1
 
             # Validation
             self.model.eval()
+            val_loss = 0.0
             with torch.no_grad():
-                val_outputs, _ = self.model(x_val)  # Get only the output
-                val_loss = self.criterion(val_outputs, y_val).item()
+                for inputs, targets, *symbols in val_loader:
+                    # Get only the output
+                    val_outputs, _ = self.model(inputs, None, *symbols)
+                    # Weight each batch by its size to get the mean over all windows
+                    val_loss += self.criterion(val_outputs, targets).item() * len(
+                        targets
+                    )
+            val_loss /= val_size
             self.model.train()
 
-            if (epoch + 1) % 10 == 0:
+            epoch_seconds = time.perf_counter() - epoch_start
+            self.training_history.append(
+                {
+                    "epoch": epoch + 1,
+                    "train_loss": epoch_loss,
+                    "val_loss": val_loss,
+                    "seconds": epoch_seconds,
+                    "samples_per_second": train_size / epoch_seconds,
+                }
+            )
+            if (epoch + 1) % 10 == 0 or self.debug:
                 print(
-                    f"Epoch [{epoch+1}/{self.config.epochs}], Training Loss: {epoch_loss:.4f}, Validation Loss: {val_loss:.4f}"
+                    f"Epoch [{epoch+1}/{self.config.epochs}], Training Loss: {epoch_loss:.4f}, Validation Loss: {val_loss:.4f}, "
+                    f"Time: {epoch_seconds:.2f}s ({train_size / epoch_seconds:.0f} samples/s)"
                 )
 
             # Early stopping logic
@@ -155,35 +306,397 @@ class LstmModel(Model):
                     print(f"Early stopping triggered at epoch {epoch + 1}")
                     break
 
-        # Save the model
+        # Streamed states and the quantized copy were made from the previous weights
+        self.reset_stream()
+        self._quantized_model = None
+
+        # Save the model and a checkpoint to fine-tune it from
         self.save()
+        self.save_checkpoint()
 
-    # pylint: disable=too-many-branches,too-many-statements
-    def inference(self, input_data: pd.DataFrame, time_steps=None) -> pd.DataFrame:
+    def train(self, data: pd.DataFrame):
+        # A global model's symbol embedding does not apply to a single series
+        self._use_symbols([])
+        scaler, dataset = self._scaled_windows(data)
+        self.scaler = scaler
+
+        # Split the windows into training and validation sets, keeping the most
+        # recent windows for validation
+        val_size = max(int(len(dataset) * self.config.validation_split), 1)
+        train_size = len(dataset) - val_size
+        train_loader = WindowBatcher(
+            dataset, range(train_size), self.config.batch_size, shuffle=True
+        )
+        val_loader = WindowBatcher(
+            dataset, range(train_size, len(dataset)), self.config.eval_batch_size
+        )
+        self._fit(train_loader, val_loader, train_size, val_size)
+
+    def train_many(self, data):
+        """
+        Train one global model on the series of many symbols.
+
+        The closes of each symbol are min-max scaled on their own range and
+        windowed, and the windows of all symbols are shuffled into shared
+        mini-batches. With config.symbol_embedding_size, the model learns an
+        embedding of each symbol next to the closes. The most recent windows of
+        every symbol are kept for validation. The saved model forecasts any of the
+        symbols, see forecast_many.
+
+        :param data: Mapping of symbol to its bars with a 'date' column or a
+            DatetimeIndex.
+        """
+        min_rows = self.config.time_steps + self.config.output_size
+        series = {}
+        for symbol, symbol_data in data.items():
+            _, scaled_closes = self._scaled_closes(symbol_data)
+            if len(scaled_closes) <= min_rows:
+                print_colored(
+                    f"Skipping {symbol}: {len(scaled_closes)} intervals, at least {min_rows + 1} are needed.",
+                    "warn",
+                )
+                continue
+            series[symbol] = scaled_closes
+        if not series:
+            raise ValueError("No symbol has enough data to train on.")
+
+        self._use_symbols(series)
+        self.scaler = None
+        dataset = SymbolWindowDataset(
+            list(series.values()),
+            self.config.time_steps,
+            horizon=self.config.output_size,
+        )
+
+        # Keep the most recent windows of every symbol for validation
+        train_indices, val_indices = [], []
+        for indices in dataset.series_indices:
+            val_size = max(int(len(indices) * self.config.validation_split), 1)
+            train_indices.append(indices[:-val_size])
+            val_indices.append(indices[-val_size:])
+        train_indices = torch.cat(train_indices)
+        val_indices = torch.cat(val_indices)
+
+        train_loader = WindowBatcher(
+            dataset, train_indices, self.config.batch_size, shuffle=True
+        )
+        val_loader = WindowBatcher(dataset, val_indices, self.config.eval_batch_size)
+        self._fit(train_loader, val_loader, len(train_indices), len(val_indices))
+
+    # pylint: disable=too-many-locals
+    def fine_tune(self, data: pd.DataFrame, epochs=None, recent=None, replay=None):
+        """
+        Warm-start training on newly arrived data.
+
+        The weights, optimizer state and epoch counter are resumed from the
+        checkpoint of the last training (or the weights alone from model.pt),
+        and the model is trained for a few epochs on the most recent windows of
+        data plus a random replay sample of older windows, which keeps it from
+        forgetting the rest of the history. Without a saved model, this falls
+        back on a full train().
+
+        :param data: Bars with a 'date' column or a DatetimeIndex, including the
+            history the replay sample is drawn from.
+        :param epochs: Epochs to train, defaults to config.fine_tune_epochs.
+        :param recent: Most recent windows to train on, defaults to
+            config.fine_tune_window.
+        :param replay: Older windows to replay, defaults to config.fine_tune_replay.
+        """
+        epochs = self.config.fine_tune_epochs if epochs is None else epochs
+        recent = self.config.fine_tune_window if recent is None else recent
+        replay = self.config.fine_tune_replay if replay is None else replay
+
+        model_dir = os.path.join(self.save_dir, self.model_name)
+        if not self.load_checkpoint():
+            if not os.path.exists(os.path.join(model_dir, "model.pt")):
+                print_colored(
+                    f"No trained model in {model_dir} to fine-tune, training from scratch.",
+                    "warn",
+                )
+                self.train(data)
+                return
+            self.load()
+
+        # The scaler is refitted like train() does, so it covers the new closes
+        scaler, dataset = self._scaled_windows(data)
+        self.scaler = scaler
+        recent_start = max(len(dataset) - recent, 0)
+        replay_indices = torch.randperm(recent_start)[:replay]
+        indices = torch.cat([replay_indices, torch.arange(recent_start, len(dataset))])
+        train_loader = WindowBatcher(
+            dataset, indices, self.config.batch_size, shuffle=True
+        )
+
+        if self.config.fine_tune_learning_rate is not None:
+            for group in self.optimizer.param_groups:
+                group["lr"] = self.config.fine_tune_learning_rate
+
+        train_model = self._configure_training()
+        self.training_history = []
+
+        self.model.train()
+        for epoch in range(epochs):
+            epoch_start = time.perf_counter()
+            epoch_loss = self._train_epoch(train_model, train_loader)
+            self.epochs_trained += 1
+
+            epoch_seconds = time.perf_counter() - epoch_start
+            self.training_history.append(
+                {
+                    "epoch": self.epochs_trained,
+                    "train_loss": epoch_loss,
+                    "seconds": epoch_seconds,
+                    "samples_per_second": len(indices) / epoch_seconds,
+                }
+            )
+            if self.debug:
+                print(
+                    f"Fine-tune epoch [{epoch + 1}/{epochs}], Training Loss: {epoch_loss:.4f}, "
+                    f"Time: {epoch_seconds:.2f}s ({len(indices) / epoch_seconds:.0f} samples/s)"
+                )
         self.model.eval()
 
-        # Ensure the 'date' column is present and set it as the index for resampling
-        if "date" in input_data.columns:
-            input_data["date"] = pd.to_datetime(input_data["date"])
-            input_data = input_data.set_index("date")  # Set 'date' as index
+        # Streamed states and the quantized copy were made from the previous weights
+        self.reset_stream()
+        self._quantized_model = None
+
+        self.save()
+        self.save_checkpoint()
+
+    def save_checkpoint(self):
+        """
+        Save a resumable checkpoint (checkpoint.pt) next to model.pt, holding the
+        weights, the optimizer state, the epoch counter and the fitted scaler.
+
+        :return: Path of the checkpoint.
+        """
+        model_dir = os.path.join(self.save_dir, self.model_name)
+        os.makedirs(model_dir, exist_ok=True)
+        checkpoint = {
+            "model": self.model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "epoch": self.epochs_trained,
+            "symbols": self.symbols,
+            # Plain values, so the checkpoint loads with weights_only
+            "scaler": (
+                None
+                if self.scaler is None
+                else {
+                    "feature_range": list(self.scaler.feature_range),
+                    "data_min": self.scaler.data_min_.tolist(),
+                    "data_max": self.scaler.data_max_.tolist(),
+                }
+            ),
+        }
+        checkpoint_path = os.path.join(model_dir, "checkpoint.pt")
+        torch.save(checkpoint, checkpoint_path)
+        if self.debug:
+            print_colored(f"Checkpoint saved as {checkpoint_path}", "success")
+        return checkpoint_path
+
+    def load_checkpoint(self):
+        """
+        Resume the weights, optimizer state, epoch counter and scaler from the
+        checkpoint saved by save_checkpoint.
+
+        :return: Whether a checkpoint was found.
+        """
+        checkpoint_path = os.path.join(self.save_dir, self.model_name, "checkpoint.pt")
+        if not os.path.exists(checkpoint_path):
+            return False
+
+        checkpoint = torch.load(checkpoint_path, weights_only=True)
+        self._use_symbols(checkpoint.get("symbols", []))
+        self.model.load_state_dict(checkpoint["model"])
+        self.optimizer.load_state_dict(checkpoint["optimizer"])
+        self.epochs_trained = checkpoint["epoch"]
+        scaler = checkpoint["scaler"]
+        if scaler is not None:
+            # Fitting on the extremes restores data_min_, data_max_ and the scale
+            self.scaler = MinMaxScaler(
+                feature_range=tuple(scaler["feature_range"])
+            ).fit(np.array([scaler["data_min"], scaler["data_max"]]))
+
+        self.reset_stream()
+        self._quantized_model = None
+        if self.debug:
+            print_colored(f"Checkpoint loaded from {checkpoint_path}", "success")
+        return True
+
+    def export(self):
+        """
+        Export the trained LSTM as a frozen TorchScript forecaster (model.ts) with
+        its config and scaling metadata (model.json), next to model.pt. The export
+        is run with models.lstm.runtime, which needs neither this module nor the
+        training dependencies.
+
+        :return: Path of the exported forecaster.
+        """
+        if self.model.symbol_embedding is not None:
+            raise ValueError(
+                "Models with a symbol embedding cannot be exported, the exported "
+                "forecaster only takes closes."
+            )
+        model_dir = os.path.join(self.save_dir, self.model_name)
+        os.makedirs(model_dir, exist_ok=True)
 
-        # Resample based on the specified interval in the config
-        input_data = input_data.resample(self.config.interval).mean().dropna()
+        self.model.eval()
+        with warnings.catch_warnings():
+            # TorchScript is deprecated in recent torch releases, but unlike
+            # torch.export it loads without any of the code that built the model
+            warnings.simplefilter("ignore", FutureWarning)
+            scripted = torch.jit.script(
+                LstmForecaster(self.model, self.config.time_steps).eval()
+            )
+            frozen = torch.jit.freeze(scripted, preserved_attrs=["forecast"])
+            model_path = os.path.join(model_dir, "model.ts")
+            torch.jit.save(frozen, model_path)
+
+        metadata = {
+            "interval": self.config.interval,
+            "time_steps": self.config.time_steps,
+            "output_size": self.config.output_size,
+            "hidden_size": self.config.hidden_size,
+            "num_layers": self.config.num_layers,
+            # Closes are min-max scaled on the closes given to each call, like
+            # inference() does
+            "scaler": {"type": "MinMaxScaler", "feature_range": [0, 1]},
+            "torch_version": torch.__version__,
+        }
+        with open(os.path.join(model_dir, "model.json"), "w", encoding="utf-8") as file:
+            json.dump(metadata, file, indent=2)
 
-        # Initialize the scaler
-        scaler = MinMaxScaler(feature_range=(0, 1))
+        if self.debug:
+            print_colored(f"TorchScript forecaster exported to {model_path}", "success")
+        return model_path
+
+    def _configure_training(self):
+        """
+        Apply the CPU settings of the config and return the module to train,
+        compiled with torch.compile if configured. The compiled module shares
+        its parameters with self.model, which is what gets saved.
+        """
+        if self.config.num_threads:
+            torch.set_num_threads(self.config.num_threads)
+        if (
+            self.config.num_interop_threads
+            and torch.get_num_interop_threads() != self.config.num_interop_threads
+        ):
+            try:
+                torch.set_num_interop_threads(self.config.num_interop_threads)
+            except RuntimeError as e:
+                # Torch only allows this before any inter-op parallel work
+                print_colored(f"Could not set inter-op threads: {e}", "warn")
+        if self.config.compile:
+            return torch.compile(self.model)
+        return self.model
+
+    def save(self):
+        """
+        Save the model, and the symbols of a global model to symbols.json, which
+        load() needs to rebuild its symbol embedding.
+        """
+        super().save()
+        symbols_path = os.path.join(self.save_dir, self.model_name, "symbols.json")
+        if self.symbols:
+            with open(symbols_path, "w", encoding="utf-8") as file:
+                json.dump({"symbols": self.symbols}, file, indent=2)
+        elif os.path.exists(symbols_path):
+            # Left over from a global model saved under the same name
+            os.remove(symbols_path)
+
+    def load(self):
+        """
+        Load the model and drop the streamed states and quantized copy of the
+        previous weights.
+        """
+        symbols_path = os.path.join(self.save_dir, self.model_name, "symbols.json")
+        symbols = []
+        if os.path.exists(symbols_path):
+            with open(symbols_path, encoding="utf-8") as file:
+                symbols = json.load(file)["symbols"]
+        self._use_symbols(symbols)
+        super().load()
+        self.reset_stream()
+        self._quantized_model = None
+
+    def _inference_model(self):
+        """
+        The module used by inference and forecast: the LSTM itself, or with
+        config.quantize its LSTM and Linear layers dynamically quantized to int8,
+        built on first use.
+        """
+        self.model.eval()
+        if not self.config.quantize:
+            return self.model
+        if self._quantized_model is None:
+            with warnings.catch_warnings():
+                # Eager quantization is deprecated in torch in favour of torchao,
+                # which is not a dependency of this project
+                warnings.simplefilter("ignore", DeprecationWarning)
+                warnings.simplefilter("ignore", UserWarning)
+                self._quantized_model = torch.ao.quantization.quantize_dynamic(
+                    self.model, {nn.LSTM, nn.Linear}, dtype=torch.qint8
+                )
+        return self._quantized_model
+
+    # pylint: disable=too-many-branches,too-many-statements
+    def inference(
+        self,
+        input_data: pd.DataFrame,
+        time_steps=None,
+        teacher_forcing=False,
+        chunk_size=None,
+        refit_scaler=True,
+    ) -> pd.DataFrame:
+        """
+        Predict the close prices of the input data.
+
+        By default predictions are recursive: each one is fed back as the input of
+        the next. With teacher_forcing, every interval is instead predicted one
+        step ahead from the actual closes of the window before it, as in a
+        backtest, in batched forward passes of chunk_size windows.
+
+        :param input_data: Bars with a 'date' column or a DatetimeIndex.
+        :param time_steps: Window length, defaults to config.time_steps.
+        :param teacher_forcing: Whether to predict every window from actual closes.
+        :param chunk_size: Windows per forward pass with teacher_forcing, defaults
+            to config.eval_batch_size.
+        :param refit_scaler: Whether to fit the scaler on the input closes. If
+            disabled, the input is scaled with the scaler fitted by train(), so
+            the closes of later rows cannot leak into earlier predictions, as in
+            a backtest.
+        :return: DataFrame with 'date' and 'prediction' columns.
+        """
+        self.model.eval()
+
+        # Read the configured interval from the shared OHLCV pyramid of the data
+        input_data = get_pyramid(input_data).resample(self.config.interval)
 
         # Set the time_steps to the configuration value if not provided
         time_steps = self.config.time_steps if time_steps is None else time_steps
 
-        # Scale the close prices using the scaler
-        close_prices_scaled = scaler.fit_transform(
-            input_data["close"].values.astype(float).reshape(-1, 1)
-        )
+        # Scale the close prices with a scaler fitted on them, or on the training data
+        close_prices = input_data["close"].values.astype(float).reshape(-1, 1)
+        if refit_scaler:
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            close_prices_scaled = scaler.fit_transform(close_prices)
+        else:
+            if self.scaler is None:
+                raise ValueError(
+                    "No scaler fitted by train() to scale the input with. Train the model or use refit_scaler=True."
+                )
+            scaler = self.scaler
+            close_prices_scaled = scaler.transform(close_prices)
 
         # Dynamically adjust time_steps if necessary
         time_steps = min(time_steps, len(close_prices_scaled))
 
+        if teacher_forcing:
+            return self._teacher_forced_inference(
+                input_data, close_prices_scaled, scaler, time_steps, chunk_size
+            )
+
         # Prepare the scaled data into time step sequences using a sliding window approach
         x_test = []
         if len(close_prices_scaled) <= time_steps:
@@ -218,63 +731,37 @@ class LstmModel(Model):
             None  # Start with no hidden state, it will be initialized on the first pass
         )
 
-        # Forward pass through the model for each step, using the recursive approach
+        # A single sequence is predicted for every interval in the input_data,
+        # otherwise once per interval after the first window
+        steps = (
+            len(input_data)
+            if len(inputs) == 1
+            else len(close_prices_scaled) - time_steps
+        )
+
+        # Forward pass through the model for each step, using the recursive approach.
+        # Only the latest window is fed to the model, so it is rolled forward
+        # rather than appended to a tensor of every window.
+        window = inputs[-1:]
+        model = self._inference_model()
         with torch.no_grad():
-            # If we have only one sequence, start prediction from there
-            if len(inputs) == 1:
-                for i in range(
-                    len(input_data)
-                ):  # Predict for every day (or interval) in the input_data
-                    predicted_scaled, hidden_state = self.model(
-                        inputs[-1:], hidden_state
-                    )  # Pass the hidden state
-                    predictions.append(predicted_scaled.cpu().numpy()[0])
-                    if self.debug:
-                        print(
-                            f"Generated prediction {i + 1}: {predicted_scaled.cpu().numpy()[0]}"
-                        )
-
-                    # Update the input for the next prediction: shift the window and append the prediction
-                    new_input_sequence = np.append(
-                        inputs[-1, 1:, :],
-                        [[predicted_scaled.cpu().numpy()[0][0]]],
-                        axis=0,
-                    )  # Slide the window
-                    new_input_sequence = np.array(
-                        new_input_sequence
-                    )  # Ensure it's a NumPy array first
-                    new_input_tensor = torch.tensor(
-                        new_input_sequence, dtype=torch.float32
-                    ).unsqueeze(
-                        0
-                    )  # Convert to tensor and add batch dimension
-                    inputs = torch.cat((inputs, new_input_tensor), dim=0)
-
-            # If we have more than one sequence, use the loop
-            else:
-                for i in range(len(close_prices_scaled) - time_steps):
-                    predicted_scaled, hidden_state = self.model(
-                        inputs[-1:], hidden_state
-                    )  # Pass the hidden state
-                    predictions.append(predicted_scaled.cpu().numpy()[0])
-                    if self.debug:
-                        print(
-                            f"Generated prediction {i + 1}: {predicted_scaled.cpu().numpy()[0]}"
-                        )
-
-                    new_input_sequence = np.append(
-                        inputs[-1, 1:, :],
-                        [[predicted_scaled.cpu().numpy()[0][0]]],
-                        axis=0,
-                    )
-                    inputs = torch.cat(
-                        (
-                            inputs,
-                            torch.tensor([new_input_sequence], dtype=torch.float32),
-                        ),
-                        dim=0,
+            for i in range(steps):
+                predicted_scaled, hidden_state = model(
+                    window, hidden_state
+                )  # Pass the hidden state
+                # Only the next interval of a multi-horizon output is fed back
+                predicted_scaled = predicted_scaled[:, :1]
+                predictions.append(predicted_scaled.cpu().numpy()[0])
+                if self.debug:
+                    print(
+                        f"Generated prediction {i + 1}: {predicted_scaled.cpu().numpy()[0]}"
                     )
 
+                # Shift the window and append the prediction
+                window = torch.cat(
+                    (window[:, 1:], predicted_scaled.view(1, 1, 1)), dim=1
+                )
+
         # Convert predictions to 2D array for inverse transform, if predictions exist
         if predictions:
             predictions = np.array(predictions).reshape(-1, 1)
@@ -307,19 +794,95 @@ class LstmModel(Model):
 
         return df_predictions
 
-    # pylint: disable=arguments-differ
-    def forecast(self, steps: int, last_known_data: pd.DataFrame) -> pd.DataFrame:
-        """Forecast future values based on the last known data."""
+    # pylint: disable=too-many-arguments
+    def _teacher_forced_inference(
+        self, input_data, close_prices_scaled, scaler, time_steps, chunk_size=None
+    ):
+        """
+        One-step-ahead predictions of every window of actual closes, in batched
+        forward passes over chunks of windows viewed from the scaled series.
+        The first time_steps intervals have no full window and are NaN.
+        """
+        chunk_size = self.config.eval_batch_size if chunk_size is None else chunk_size
+        dataset = WindowDataset(
+            torch.from_numpy(close_prices_scaled.ravel().astype(np.float32)),
+            max(time_steps, 1),
+        )
+        if len(dataset) == 0:
+            raise ValueError(
+                f"Not enough data for teacher-forced inference. Required more than {time_steps} intervals."
+            )
+
+        predictions = np.full(len(input_data), np.nan)
+        model = self._inference_model()
+        with torch.no_grad():
+            position = len(input_data) - len(dataset)
+            for inputs, _ in WindowBatcher(dataset, range(len(dataset)), chunk_size):
+                predicted_scaled, _ = model(inputs)
+                predictions[position : position + len(inputs)] = (
+                    scaler.inverse_transform(predicted_scaled[:, :1].numpy()).ravel()
+                )
+                position += len(inputs)
+
+        return pd.DataFrame(
+            {"date": input_data.index, "prediction": predictions}
+        ).reset_index(drop=True)
+
+    def _forecast_scaled(self, model, window, steps, symbols=None):
+        """
+        Forecast steps scaled closes after each window of shape (batch,
+        time_steps, 1). The whole horizon of the output head is predicted per
+        forward pass, so steps within the trained horizon take a single pass, and
+        predictions are fed back as inputs for longer forecasts.
+
+        :param symbols: Symbol ids of the windows for models with a symbol
+            embedding, see _symbol_ids.
+        :return: Tensor of shape (batch, steps).
+        """
+        predicted_chunks = []
+        predicted_count = 0
+        with torch.no_grad():
+            while predicted_count < steps:
+                predicted_scaled, _ = model(window, None, symbols)
+                predicted_chunks.append(predicted_scaled)
+                predicted_count += predicted_scaled.shape[1]
+                if predicted_count < steps:
+                    window = torch.cat((window, predicted_scaled.unsqueeze(-1)), dim=1)[
+                        :, -self.config.time_steps :
+                    ]
+        return torch.cat(predicted_chunks, dim=1)[:, :steps]
+
+    # pylint: disable=arguments-differ,too-many-locals
+    def forecast(
+        self,
+        steps: int,
+        last_known_data: pd.DataFrame,
+        quantiles=None,
+        samples=None,
+        symbol=None,
+    ) -> pd.DataFrame:
+        """
+        Forecast future values based on the last known data.
+
+        With quantiles, Monte-Carlo dropout bands are added: the window is tiled
+        into samples rows that run through the model with dropout active, in one
+        batched pass per horizon, and the quantiles of the sampled paths are
+        taken per step.
+
+        :param steps: Number of intervals to forecast.
+        :param last_known_data: Bars with a 'date' column or a DatetimeIndex.
+        :param quantiles: Optional quantiles of the bands, e.g. (0.05, 0.5, 0.95).
+        :param samples: Dropout samples, defaults to config.mc_samples.
+        :param symbol: Symbol of the data, needed by global models with a symbol
+            embedding.
+        :return: DataFrame with 'date', 'Forecasted Close' and, with quantiles, a
+            'Close q<quantile>' column per quantile.
+        """
         self.model.eval()
         scaler = MinMaxScaler(feature_range=(0, 1))
 
-        # Ensure 'date' column exists and set it as index for resampling
-        if "date" in last_known_data.columns:
-            last_known_data["date"] = pd.to_datetime(last_known_data["date"])
-            last_known_data = last_known_data.set_index("date")
-
-        # Resample based on the specified interval in the config
-        last_known_data = last_known_data.resample(self.config.interval).mean().dropna()
+        # Read the configured interval from the shared OHLCV pyramid of the data
+        last_known_data = get_pyramid(last_known_data).resample(self.config.interval)
 
         # Ensure there is enough data to use for forecasting
         if len(last_known_data) < self.config.time_steps:
@@ -331,34 +894,19 @@ class LstmModel(Model):
         close_prices_scaled = scaler.fit_transform(
             last_known_data["close"].values.astype(float).reshape(-1, 1)
         )
-
-        # Prepare the last sequence of data for forecasting
-        last_sequence = close_prices_scaled[-self.config.time_steps :].reshape(
-            1, self.config.time_steps, 1
-        )
-        predictions = []
-
-        with torch.no_grad():
-            for step in range(steps):
-                inputs = torch.tensor(last_sequence, dtype=torch.float32)
-                predicted_scaled, _ = self.model(
-                    inputs
-                )  # Pass the inputs through the model
-                predicted_scaled = predicted_scaled.cpu().numpy()
-
-                # Inverse transform the predicted value
-                predicted = scaler.inverse_transform(predicted_scaled)
-                predictions.append(predicted.flatten()[0])
-
-                # Update the last sequence with the new prediction (shift window)
-                new_entry = np.append(last_sequence[0, 1:], predicted_scaled)
-                # pylint: disable=too-many-function-args
-                last_sequence = new_entry.reshape(1, self.config.time_steps, 1)
-
-                if self.debug:
-                    print(
-                        f"Step {step + 1}/{steps}, Predicted: {predicted.flatten()[0]}"
-                    )
+        window = torch.from_numpy(
+            close_prices_scaled[-self.config.time_steps :].astype(np.float32)
+        ).view(1, -1, 1)
+        model = self._inference_model()
+        symbols = self._symbol_ids([symbol])
+
+        # Inverse transform all predicted values at once
+        predictions = scaler.inverse_transform(
+            self._forecast_scaled(model, window, steps, symbols).numpy().reshape(-1, 1)
+        ).ravel()
+        if self.debug:
+            for step, predicted in enumerate(predictions):
+                print(f"Step {step + 1}/{steps}, Predicted: {predicted}")
 
         # Resample the index back to original or forecast interval
         forecast_dates = pd.date_range(
@@ -377,15 +925,146 @@ class LstmModel(Model):
             }
         )
 
+        if quantiles is not None:
+            samples = self.config.mc_samples if samples is None else samples
+            with mc_dropout(model):
+                sampled = self._forecast_scaled(
+                    model,
+                    window.repeat(samples, 1, 1),
+                    steps,
+                    None if symbols is None else symbols.repeat(samples),
+                )
+            sampled = scaler.inverse_transform(sampled.numpy().reshape(-1, 1)).reshape(
+                samples, steps
+            )
+            bands = np.quantile(sampled, quantiles, axis=0)
+            for quantile, band in zip(quantiles, bands):
+                df_forecast[f"Close q{quantile:g}"] = band
+
         return df_forecast
 
-    def _prepare_data(self, data, time_steps=None):
-        """Prepare data into sequences for the LSTM."""
-        if time_steps is None:
-            time_steps = self.config.time_steps
-        result = []
-        if len(data) <= time_steps:
-            time_steps = len(data) - 1
-        for i in range(time_steps, len(data)):
-            result.append(data[i - time_steps : i, 0])
-        return np.array(result)
+    def forecast_many(self, steps: int, last_known_data) -> dict:
+        """
+        Forecast many symbols at once with a global model (see train_many).
+
+        The windows of all symbols are stacked into one batch, so each horizon of
+        the forecast is a single forward pass for every symbol. The closes of each
+        symbol are scaled on their own range like forecast() does, so a model
+        without a symbol embedding forecasts each symbol as forecast() would.
+
+        :param steps: Number of intervals to forecast.
+        :param last_known_data: Mapping of symbol to its bars with a 'date' column
+            or a DatetimeIndex.
+        :return: Mapping of symbol to a DataFrame with 'date' and 'Forecasted Close'.
+        """
+        if not last_known_data:
+            raise ValueError("No symbols to forecast.")
+        self.model.eval()
+        symbols = list(last_known_data)
+        symbol_ids = self._symbol_ids(symbols)
+
+        frames, scalers, windows = [], [], []
+        for symbol in symbols:
+            # Read the configured interval from the shared OHLCV pyramid of the data
+            frame = get_pyramid(last_known_data[symbol]).resample(self.config.interval)
+            if len(frame) < self.config.time_steps:
+                raise ValueError(
+                    f"Not enough data to forecast {symbol}. Required at least {self.config.time_steps} data points."
+                )
+            closes = frame["close"].values.astype(float).reshape(-1, 1)
+            scaler = MinMaxScaler(feature_range=(0, 1)).fit(closes)
+            frames.append(frame)
+            scalers.append(scaler)
+            windows.append(scaler.transform(closes[-self.config.time_steps :]))
+
+        window = torch.from_numpy(np.stack(windows).astype(np.float32))
+        predicted = self._forecast_scaled(
+            self._inference_model(), window, steps, symbol_ids
+        ).numpy()
+
+        forecasts = {}
+        for symbol, frame, scaler, predicted_scaled in zip(
+            symbols, frames, scalers, predicted
+        ):
+            forecasts[symbol] = pd.DataFrame(
+                {
+                    "date": pd.date_range(
+                        start=frame.index[-1],
+                        periods=steps + 1,
+                        freq=self.config.interval,
+                    )[1:],
+                    "Forecasted Close": scaler.inverse_transform(
+                        predicted_scaled.reshape(-1, 1)
+                    ).ravel(),
+                }
+            )
+        return forecasts
+
+    def reset_stream(self, symbol=None):
+        """Forget the streaming state of a symbol, or of every symbol."""
+        self.state_cache.remove(symbol)
+
+    def warm_stream(self, history: pd.DataFrame, symbol="default", warm_steps=None):
+        """
+        Start streaming a symbol from its recent history.
+
+        The closes are scaled like inference() scales its input, with a scaler
+        fitted on the history, which stays fixed while streaming. The last
+        warm_steps intervals are run through the LSTM in one pass to initialize
+        the symbol's state.
+
+        :param history: Bars of the symbol with a 'date' column or a DatetimeIndex.
+        :param symbol: Name of the stream.
+        :param warm_steps: Intervals to warm up on, defaults to config.time_steps.
+        :return: Predicted close of the interval after the history.
+        """
+        self.model.eval()
+        closes = get_pyramid(history).resample(self.config.interval)["close"]
+        closes = closes.to_numpy(dtype=np.float64).reshape(-1, 1)
+        if len(closes) == 0:
+            raise ValueError("No history to warm up the stream on.")
+
+        scaler = MinMaxScaler(feature_range=(0, 1)).fit(closes)
+        scale, offset = float(scaler.scale_[0]), float(scaler.min_[0])
+        warm_steps = self.config.time_steps if warm_steps is None else warm_steps
+
+        self.state_cache.remove(symbol)
+        inputs = torch.from_numpy(
+            (closes[-warm_steps:] * scale + offset).astype(np.float32)
+        ).unsqueeze(0)
+        with torch.no_grad():
+            predicted_scaled, hidden_state = self.model(inputs)
+        self.state_cache.store(symbol, hidden_state)
+        self.state_cache.scalers[symbol] = (scale, offset)
+        return (predicted_scaled[0, 0].item() - offset) / scale
+
+    def stream_inference(self, close, symbol="default") -> float:
+        """
+        Predict the next close of a warmed-up symbol from the close of a new
+        interval, in O(1): only the new timestep is fed to the LSTM, starting from
+        the symbol's cached (h, c) state.
+
+        Predictions carry the state of all streamed intervals, so they match
+        windowed predictions with the same scaling within the tolerance of how
+        much the LSTM remembers beyond time_steps. They are scaled with the
+        scaler fitted by warm_stream, whereas inference() fits one on all of its
+        input, so the two can differ by more than that.
+
+        :param close: Close of the new interval, or a mapping with a 'close'.
+        :param symbol: Name of the stream, see warm_stream.
+        :return: Predicted close of the following interval.
+        """
+        if symbol not in self.state_cache:
+            raise ValueError(
+                f"Stream {symbol} is not warmed up. Call warm_stream() first."
+            )
+        if not isinstance(close, (int, float, np.number)):
+            close = close["close"]
+
+        scale, offset = self.state_cache.scalers[symbol]
+        inputs = self.state_cache.step_input
+        inputs.fill_(close * scale + offset)
+        with torch.no_grad():
+            # The symbol's state is updated in place in the cache
+            predicted_scaled = self.model.step(inputs, self.state_cache.state(symbol))
+        return (predicted_scaled[0, 0].item() - offset) / scale
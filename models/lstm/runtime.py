@@ -0,0 +1,60 @@
+import json
+import os
+import warnings
+
+import torch
+
+
+class ExportedLstm:
+    """
+    LSTM forecaster exported by LstmModel.export, run without the training code.
+
+    Only torch is imported, and the frozen TorchScript graph needs neither the
+    model classes nor an optimizer, so workers start serving faster. Closes
+    must be at the exported interval (metadata['interval']), oldest first.
+    """
+
+    def __init__(self, folder=os.path.join("trained_models", "lstm")):
+        """
+        :param folder: Folder holding the model.ts and model.json of the export.
+        """
+        with warnings.catch_warnings():
+            # TorchScript is deprecated in recent torch releases, see export()
+            warnings.simplefilter("ignore", FutureWarning)
+            self.module = torch.jit.load(os.path.join(folder, "model.ts"))
+        with open(os.path.join(folder, "model.json"), "r", encoding="utf-8") as file:
+            self.metadata = json.load(file)
+
+    def _run(self, method, closes, *args):
+        """Run a method of the module on one series or a 2D batch of series."""
+        batch = torch.tensor(closes, dtype=torch.float64)
+        single = batch.dim() == 1
+        # Skip the profiling runs that specialize fusion groups, which would
+        # otherwise make the first predictions several times slower. The LSTM
+        # ops run as single fused kernels either way. The fusion strategy is
+        # process-wide, so the previous one is restored after the call.
+        previous = torch.jit.set_fusion_strategy([("STATIC", 0), ("DYNAMIC", 0)])
+        try:
+            with torch.inference_mode():
+                predictions = method(batch.unsqueeze(0) if single else batch, *args)
+        finally:
+            torch.jit.set_fusion_strategy(previous)
+        return predictions[0] if single else predictions
+
+    def predict(self, closes):
+        """
+        Predict the next output_size closes after a series of closes.
+
+        :param closes: Sequence of closes, or a 2D batch of series.
+        :return: Tensor of shape (output_size,), or (batch, output_size).
+        """
+        return self._run(self.module, closes)
+
+    def forecast(self, closes, steps: int):
+        """
+        Forecast the steps closes after a series of closes.
+
+        :param closes: Sequence of closes, or a 2D batch of series.
+        :return: Tensor of shape (steps,), or (batch, steps).
+        """
+        return self._run(self.module.forecast, closes, steps)
@@ -0,0 +1,255 @@
+from contextlib import contextmanager
+
+import torch
+from torch import nn
+from torch.utils.data import Dataset
+
+
+class WindowDataset(Dataset):
+    """
+    Sliding windows of a 1D series for next-step training, without copying them.
+
+    Sample i is the window series[i : i + time_steps] with the targets
+    series[i + time_steps : i + time_steps + horizon]. Windows and targets are
+    unfold views of the series, so the dataset holds the series once instead of
+    time_steps copies of it.
+    """
+
+    def __init__(self, series: torch.Tensor, time_steps: int, horizon=1):
+        """
+        :param series: Scaled 1D series.
+        :param time_steps: Length of each window.
+        :param horizon: Number of intervals after each window to predict.
+        """
+        self.series = series
+        self.time_steps = time_steps
+        self.horizon = horizon
+        # Window i is series[i : i + time_steps], a view of shape
+        # (n - time_steps - horizon + 1, time_steps)
+        self.windows = series[: len(series) - horizon].unfold(0, time_steps, 1)
+        self.targets = series[time_steps:].unfold(0, horizon, 1)
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __getitem__(self, index):
+        return self.windows[index].unsqueeze(-1), self.targets[index]
+
+    def batch(self, indices: torch.Tensor):
+        """
+        Gather the windows and targets of several samples with one indexing op.
+
+        :return: Tuple of (inputs of shape (batch, time_steps, 1), targets of shape
+            (batch, horizon)).
+        """
+        return self.windows[indices].unsqueeze(-1), self.targets[indices]
+
+
+class SymbolWindowDataset(WindowDataset):
+    """
+    Sliding windows of the series of many symbols, for global training.
+
+    The series are concatenated and windowed like WindowDataset, but only the
+    windows that lie within one series are valid samples. Their positions in the
+    concatenated series are given per series by series_indices, and batches of
+    any mix of symbols are gathered with one indexing op, together with the
+    symbol id of each window.
+    """
+
+    def __init__(self, series, time_steps: int, horizon=1):
+        """
+        :param series: Scaled 1D series of each symbol, each longer than
+            time_steps + horizon - 1.
+        :param time_steps: Length of each window.
+        :param horizon: Number of intervals after each window to predict.
+        """
+        super().__init__(torch.cat(list(series)), time_steps, horizon)
+        self.series_indices = []
+        # Symbol id of the window starting at each position
+        self.symbols = torch.zeros(len(self.targets), dtype=torch.long)
+        offset = 0
+        for symbol, values in enumerate(series):
+            count = len(values) - time_steps - horizon + 1
+            self.series_indices.append(torch.arange(offset, offset + count))
+            self.symbols[offset : offset + len(values)] = symbol
+            offset += len(values)
+
+    def __len__(self):
+        return sum(len(indices) for indices in self.series_indices)
+
+    def batch(self, indices: torch.Tensor):
+        """
+        Gather the windows, targets and symbols of several samples.
+
+        :param indices: Positions of valid windows, see series_indices.
+        :return: Tuple of (inputs of shape (batch, time_steps, 1), targets of shape
+            (batch, horizon), symbol ids of shape (batch,)).
+        """
+        return (*super().batch(indices), self.symbols[indices])
+
+
+class WindowBatcher:
+    """
+    Mini-batches of a WindowDataset, each gathered with one indexing op instead of
+    collating one tensor per sample like a DataLoader.
+    """
+
+    def __init__(self, dataset: WindowDataset, indices, batch_size, shuffle=False):
+        """
+        :param dataset: Dataset to batch.
+        :param indices: Indices of the samples to batch, e.g. a training range.
+        :param batch_size: Samples per batch, the last batch may be smaller.
+        :param shuffle: Whether to shuffle the samples on every pass.
+        """
+        self.dataset = dataset
+        self.indices = torch.as_tensor(indices, dtype=torch.long)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+
+    def __len__(self):
+        return -(-len(self.indices) // self.batch_size)
+
+    def __iter__(self):
+        indices = self.indices
+        if self.shuffle:
+            indices = indices[torch.randperm(len(indices))]
+        for start in range(0, len(indices), self.batch_size):
+            yield self.dataset.batch(indices[start : start + self.batch_size])
+
+
+class LstmStateCache:
+    """
+    Preallocated LSTM states (h, c) of many symbols for incremental inference.
+
+    States of all symbols live in two tensors of shape (capacity, num_layers,
+    hidden_size), which double in capacity when full, so stepping a symbol
+    reads and writes its slot in place instead of allocating new states.
+    """
+
+    def __init__(self, num_layers, hidden_size, capacity=16):
+        self.num_layers = num_layers
+        self.hidden_size = hidden_size
+        self.h = torch.zeros(capacity, num_layers, hidden_size)
+        self.c = torch.zeros(capacity, num_layers, hidden_size)
+        # Input of a single step, reused by every call
+        self.step_input = torch.zeros(1, 1)
+        self.slots = {}
+        # Affine scaling (scale, offset) of each symbol's closes
+        self.scalers = {}
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __contains__(self, symbol):
+        return symbol in self.slots
+
+    def _grow(self):
+        capacity = len(self.h)
+        self.h = torch.cat([self.h, torch.zeros_like(self.h)])
+        self.c = torch.cat([self.c, torch.zeros_like(self.c)])
+        self._free = list(range(2 * capacity - 1, capacity - 1, -1))
+
+    def state(self, symbol):
+        """
+        The state of a symbol as views of shape (num_layers, 1, hidden_size),
+        allocating a zero state for new symbols.
+        """
+        slot = self.slots.get(symbol)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self.slots[symbol] = self._free.pop()
+            self.h[slot].zero_()
+            self.c[slot].zero_()
+        return self.h[slot].unsqueeze(1), self.c[slot].unsqueeze(1)
+
+    def store(self, symbol, hidden_state):
+        """Write a state returned by the LSTM into the symbol's slot."""
+        h, c = self.state(symbol)
+        h.copy_(hidden_state[0])
+        c.copy_(hidden_state[1])
+
+    def remove(self, symbol=None):
+        """Free the slot of a symbol, or of every symbol."""
+        symbols = list(self.slots) if symbol is None else [symbol]
+        for name in symbols:
+            if name in self.slots:
+                self._free.append(self.slots.pop(name))
+            self.scalers.pop(name, None)
+
+
+class LstmForecaster(nn.Module):
+    """
+    Self-contained forecaster of a trained LSTM, for export with TorchScript.
+
+    Takes raw closes and does the min-max scaling of LstmModel.inference itself,
+    fitted on the given closes, so running it needs nothing but torch.
+    """
+
+    def __init__(self, model: nn.Module, time_steps: int):
+        super().__init__()
+        self.model = model
+        self.time_steps = time_steps
+
+    def forward(self, closes: torch.Tensor) -> torch.Tensor:
+        """
+        Predict the intervals after each series of closes.
+
+        :param closes: Closes of shape (batch, n), oldest first.
+        :return: Predicted closes of shape (batch, output_size).
+        """
+        closes = closes.to(torch.float64)
+        low = closes.min(dim=1, keepdim=True).values
+        span = closes.max(dim=1, keepdim=True).values - low
+        # Constant series are scaled like MinMaxScaler does, with a scale of one
+        span = torch.where(span == 0, torch.ones_like(span), span)
+        scaled = (closes[:, -self.time_steps :] - low) / span
+        out, _ = self.model(scaled.to(torch.float32).unsqueeze(-1))
+        return out.to(torch.float64) * span + low
+
+    @torch.jit.export
+    def forecast(self, closes: torch.Tensor, steps: int) -> torch.Tensor:
+        """
+        Forecast steps intervals after each series of closes, feeding predictions
+        back as inputs beyond the horizon of the output head.
+
+        :param closes: Closes of shape (batch, n), oldest first.
+        :return: Forecasted closes of shape (batch, steps).
+        """
+        closes = closes.to(torch.float64)
+        low = closes.min(dim=1, keepdim=True).values
+        span = closes.max(dim=1, keepdim=True).values - low
+        span = torch.where(span == 0, torch.ones_like(span), span)
+        window = ((closes[:, -self.time_steps :] - low) / span).to(torch.float32)
+
+        predicted = []
+        count = 0
+        while count < steps:
+            out, _ = self.model(window.unsqueeze(-1))
+            predicted.append(out)
+            count += out.size(1)
+            window = torch.cat((window, out), dim=1)[:, -self.time_steps :]
+        forecast = torch.cat(predicted, dim=1)[:, :steps]
+        return forecast.to(torch.float64) * span + low
+
+
+@contextmanager
+def mc_dropout(model: nn.Module):
+    """
+    Activate the dropout of a model in eval mode for Monte-Carlo sampling, while
+    batch normalization keeps using its running statistics.
+
+    Recurrent layers apply their dropout between layers in train mode. They are
+    found by their float dropout attribute rather than by type, so the
+    dynamically quantized LSTM of the int8 copy is sampled too. The previous
+    mode of every module is restored afterwards.
+    """
+    modes = {module: module.training for module in model.modules()}
+    for module in modes:
+        if isinstance(module, nn.Dropout) or isinstance(
+            getattr(module, "dropout", None), float
+        ):
+            module.train()
+    try:
+        yield model
+    finally:
+        for module, training in modes.items():
+            module.training = training
@@ -1,14 +1,16 @@
 # pylint: disable=R0801
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import MinMaxScaler
 
 from models.base_model import Model
 from models.random_forest_time_series.configs import RandomForestTimeSeriesConfig
-from utils.model_commons import create_lag_features, split_and_scale_data
+from utils.feature_store import get_feature_store
+from utils.lag_stream import LagStreamingMixin
 
 
-class RandomForestTimeSeriesModel(Model):
+class RandomForestTimeSeriesModel(LagStreamingMixin, Model):
     """Random Forest model for time series forecasting."""
 
     def __init__(
@@ -28,25 +30,21 @@ class RandomForestTimeSeriesModel(Model):
         self.n_lags = self.config.n_lags  # Use configurable number of lags
 
     def train(self, data: pd.DataFrame):
-        # Create lag features for the 'close' column
-        data_with_lags = create_lag_features(data, "close", self.n_lags)
-
-        # Define features and target (lags as features, close as target)
-        features = data_with_lags[
-            ["open", "high", "low", "volume"]
-            + [f"lag_{i}" for i in range(1, self.n_lags + 1)]
-        ].values
-        target = data_with_lags["close"].values
-
-        # Split data into training and validation sets Fit and transform the scaler during training
-        x_train_scaled, x_val_scaled, y_train, y_val, self.scaler = (
-            split_and_scale_data(
-                features,
-                target,
-                scaler=self.scaler,
-                test_size=self.config.test_size,
-                random_state=self.config.random_state,
-            )
+        # Split and scale the features (OHLV and lags of 'close') and target
+        # ('close'), shared with the other lag-based models splitting the same way
+        (
+            x_train_scaled,
+            x_val_scaled,
+            y_train,
+            y_val,
+            self.scaler,
+        ) = get_feature_store().split_and_scale(
+            data,
+            "close",
+            self.n_lags,
+            scaler=self.scaler,
+            test_size=self.config.test_size,
+            random_state=self.config.random_state,
         )
 
         # Train the Random Forest model
@@ -56,6 +54,9 @@ class RandomForestTimeSeriesModel(Model):
         val_score = self.model.score(x_val_scaled, y_val)
         print(f"Validation R^2 score: {val_score:.4f}")
 
+        # Streamed features were scaled for the previous fit
+        self.reset_stream()
+
         # Save the model
         self.save()
 
@@ -65,11 +66,9 @@ class RandomForestTimeSeriesModel(Model):
             raise ValueError("Input data must be a Pandas DataFrame.")
 
         # Create lag features for prediction
-        input_data_with_lags = create_lag_features(input_data, "close", self.n_lags)
-        features = input_data_with_lags[
-            ["open", "high", "low", "volume"]
-            + [f"lag_{i}" for i in range(1, self.n_lags + 1)]
-        ].values
+        features, _, index = get_feature_store().lag_matrix(
+            input_data, "close", self.n_lags
+        )
 
         # Check if there are enough samples for inference
         if len(features) == 0:
@@ -83,10 +82,8 @@ class RandomForestTimeSeriesModel(Model):
         # Make predictions using the trained model
         predictions = self.model.predict(features_scaled)
 
-        # Ensure the predictions have the same index as input_data_with_lags, not input_data
-        predictions_df = pd.DataFrame(
-            {"prediction": predictions}, index=input_data_with_lags.index
-        )
+        # Ensure the predictions have the index of the rows they were made for
+        predictions_df = pd.DataFrame({"prediction": predictions}, index=index)
 
         # Merge the predictions back with the original input_data index, filling NaNs for the initial rows
         result = pd.DataFrame(
@@ -98,6 +95,13 @@ class RandomForestTimeSeriesModel(Model):
 
         return result
 
+    def _predict_row(self, row) -> float:
+        # Average the trees directly, skipping predict()'s validation and thread
+        # pool, which dominate the cost of predicting a single row
+        row = row.astype(np.float32)
+        total = sum(tree.tree_.predict(row)[0, 0] for tree in self.model.estimators_)
+        return float(total / len(self.model.estimators_))
+
     def forecast(self, steps: int) -> pd.DataFrame:
         # A simple dummy forecast implementation for now
         return pd.DataFrame({"forecast": [0] * steps})
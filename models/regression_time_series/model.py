@@ -4,10 +4,11 @@ from sklearn.preprocessing import MinMaxScaler
 
 from models.base_model import Model
 from models.regression_time_series.configs import RegressionTimeSeriesConfig
-from utils.model_commons import create_lag_features
+from utils.feature_store import get_feature_store
+from utils.lag_stream import LagStreamingMixin
 
 
-class RegressionTimeSeriesModel(Model):
+class RegressionTimeSeriesModel(LagStreamingMixin, Model):
     """Linear Regression model for time series forecasting with lag features."""
 
     def __init__(
@@ -27,15 +28,9 @@ class RegressionTimeSeriesModel(Model):
         self.config = config
 
     def train(self, data: pd.DataFrame):
-        # Create lag features for the 'close' column
-        data_with_lags = create_lag_features(data, "close", self.n_lags)
-
-        # Define features and target (lags as features, 'close' as target)
-        x = data_with_lags[
-            ["open", "high", "low", "volume"]
-            + [f"lag_{i}" for i in range(1, self.n_lags + 1)]
-        ]
-        y = data_with_lags["close"]
+        # Get the features (OHLV and lags of 'close') and target ('close') shared
+        # by the lag-based models
+        x, y, _ = get_feature_store().lag_matrix(data, "close", self.n_lags)
 
         # Normalize the features using MinMaxScaler
         x_scaled = self.scaler.fit_transform(x)
@@ -43,18 +38,17 @@ class RegressionTimeSeriesModel(Model):
         # Train the linear regression model
         self.model.fit(x_scaled, y)
 
+        # Streamed features were scaled for the previous fit
+        self.reset_stream()
+
         # Save the model and scaler
         self.save()
 
     def inference(self, input_data: pd.DataFrame) -> pd.DataFrame:
-        # Create lag features for prediction
-        input_data_with_lags = create_lag_features(input_data, "close", self.n_lags)
-
-        # Define features for prediction
-        x_test = input_data_with_lags[
-            ["open", "high", "low", "volume"]
-            + [f"lag_{i}" for i in range(1, self.n_lags + 1)]
-        ]
+        # Build the features for prediction
+        x_test, _, index = get_feature_store().lag_matrix(
+            input_data, "close", self.n_lags
+        )
 
         # Check if there are enough samples for inference
         if len(x_test) == 0:
@@ -68,10 +62,8 @@ class RegressionTimeSeriesModel(Model):
         # Predict using the trained model
         predictions = self.model.predict(x_test_scaled)
 
-        # Ensure the predictions have the same index as input_data_with_lags, not input_data
-        predictions_df = pd.DataFrame(
-            {"prediction": predictions}, index=input_data_with_lags.index
-        )
+        # Ensure the predictions have the index of the rows they were made for
+        predictions_df = pd.DataFrame({"prediction": predictions}, index=index)
 
         # Merge the predictions back with the original input_data index, filling NaNs for the initial rows
         result = pd.DataFrame(
@@ -83,6 +75,10 @@ class RegressionTimeSeriesModel(Model):
 
         return result
 
+    def _predict_row(self, row) -> float:
+        # Dot product with the coefficients, skipping predict()'s input validation
+        return float(row[0] @ self.model.coef_ + self.model.intercept_)
+
     def forecast(self, steps: int) -> pd.DataFrame:
         """Linear regression models generally don't forecast directly; dummy implementation for now."""
         return pd.DataFrame({"forecast": ["N/A"] * steps})
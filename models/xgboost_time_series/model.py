@@ -5,10 +5,11 @@ from sklearn.preprocessing import MinMaxScaler
 
 from models.base_model import Model
 from models.xgboost_time_series.configs import XgboostTimeSeriesConfig
-from utils.model_commons import create_lag_features, split_and_scale_data
+from utils.feature_store import get_feature_store
+from utils.lag_stream import LagStreamingMixin
 
 
-class XgboostTimeSeriesModel(Model):
+class XgboostTimeSeriesModel(LagStreamingMixin, Model):
     """XGBoost model for time series forecasting."""
 
     def __init__(
@@ -25,23 +26,19 @@ class XgboostTimeSeriesModel(Model):
         self.n_lags = self.config.n_lags  # Use the lag configuration from the config
 
     def train(self, data: pd.DataFrame):
-        # Create lag features for the 'close' column
-        data_with_lags = create_lag_features(data, "close", self.n_lags)
-
-        # Define features and target
-        features = data_with_lags[
-            ["open", "high", "low", "volume"]
-            + [f"lag_{i}" for i in range(1, self.n_lags + 1)]
-        ].values
-        target = data_with_lags["close"].values
-
-        # Split data into training and validation sets Fit and transform the scaler during training
-        x_train_scaled, x_val_scaled, y_train, y_val, self.scaler = (
-            split_and_scale_data(
-                features,
-                target,
-                scaler=self.scaler,
-            )
+        # Split and scale the features (OHLV and lags of 'close') and target
+        # ('close'), shared with the other lag-based models splitting the same way
+        (
+            x_train_scaled,
+            x_val_scaled,
+            y_train,
+            y_val,
+            self.scaler,
+        ) = get_feature_store().split_and_scale(
+            data,
+            "close",
+            self.n_lags,
+            scaler=self.scaler,
         )
 
         # Convert data to XGBoost DMatrix
@@ -61,18 +58,17 @@ class XgboostTimeSeriesModel(Model):
             verbose_eval=True,
         )
 
+        # Streamed features were scaled for the previous fit
+        self.reset_stream()
+
         # Save the model after training
         self.save()
 
     def inference(self, input_data: pd.DataFrame) -> pd.DataFrame:
         # Create lag features for prediction
-        input_data_with_lags = create_lag_features(input_data, "close", self.n_lags)
-
-        # Select and scale the features for prediction
-        features = input_data_with_lags[
-            ["open", "high", "low", "volume"]
-            + [f"lag_{i}" for i in range(1, self.n_lags + 1)]
-        ].values
+        features, _, index = get_feature_store().lag_matrix(
+            input_data, "close", self.n_lags
+        )
 
         # Check if there are enough samples for inference
         if len(features) == 0:
@@ -88,10 +84,8 @@ class XgboostTimeSeriesModel(Model):
         # Predict using the trained XGBoost model
         predictions = self.model.predict(dtest)
 
-        # Ensure the predictions have the same index as input_data_with_lags, not input_data
-        predictions_df = pd.DataFrame(
-            {"prediction": predictions}, index=input_data_with_lags.index
-        )
+        # Ensure the predictions have the index of the rows they were made for
+        predictions_df = pd.DataFrame({"prediction": predictions}, index=index)
 
         # Merge the predictions back with the original input_data index, filling NaNs for the initial rows
         result = pd.DataFrame(
@@ -103,6 +97,10 @@ class XgboostTimeSeriesModel(Model):
 
         return result
 
+    def _predict_row(self, row) -> float:
+        # Predict straight from the array without building a DMatrix
+        return float(self.model.inplace_predict(row)[0])  # type: ignore
+
     def forecast(self, steps: int) -> pd.DataFrame:
         """Dummy forecast logic, should be adapted for time series forecasting."""
         return pd.DataFrame({"forecast": [0] * steps})
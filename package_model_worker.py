@@ -76,6 +76,13 @@ def package_model(model_name):
     if scaler_exists:
         shutil.copy(scaler_file, model_trained_dir)
 
+    # Copy the exported TorchScript forecaster, its metadata and the symbols of
+    # global models if they exist
+    for export_file in ("model.ts", "model.json", "symbols.json"):
+        export_path = f"trained_models/{model_name}/{export_file}"
+        if os.path.exists(export_path):
+            shutil.copy(export_path, model_trained_dir)
+
     # Copy and modify import paths in the model script and its dependencies
     for py_file in glob.glob(f"{model_script_dir}/*.py"):
         copy_and_modify_imports(py_file, model_output_dir, model_name)
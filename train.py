@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 # pylint: disable=no-name-in-module
 from configs import models
 from data.csv_loader import CSVLoader
+from data.ohlcv_store import OHLCVStore
 from data.tiingo_data_fetcher import DataFetcher
 from data.utils.data_preprocessing import preprocess_data
 from models.model_factory import ModelFactory
@@ -15,7 +16,10 @@ from utils.common import print_colored
 
 
 def select_data(fetcher, default_selection=None, file_path=None):
-    """Provide an interface to choose between Tiingo stock, Tiingo crypto, or CSV data."""
+    """
+    Provide an interface to choose between Tiingo stock, Tiingo crypto, CSV data,
+    or a series already in the fetcher's OHLCV store.
+    """
 
     default_end_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
 
@@ -24,8 +28,9 @@ def select_data(fetcher, default_selection=None, file_path=None):
         print("1. Tiingo Stock Data")
         print("2. Tiingo Crypto Data")
         print("3. Load data from CSV file")
+        print("4. Load data from the OHLCV store")
 
-        selection = input("Enter your choice (1/2/3): ").strip()
+        selection = input("Enter your choice (1/2/3/4): ").strip()
     else:
         selection = default_selection
 
@@ -85,6 +90,17 @@ def select_data(fetcher, default_selection=None, file_path=None):
             file_path = input("Enter the CSV file path: ").strip()
         return CSVLoader.load_csv(file_path)
 
+    if selection == "4":
+        print("You selected to load data from the OHLCV store.")
+        print(f"Available series: {', '.join(fetcher.store.keys()) or 'none'}")
+        symbol = input("Enter the symbol (default: btcusd): ").strip() or "btcusd"
+        frequency = input("Enter the frequency (default: 1day): ").strip() or "1day"
+        start_date = input("Enter the start date (YYYY-MM-DD, optional): ").strip()
+        end_date = input("Enter the end date (YYYY-MM-DD, optional): ").strip()
+        return fetcher.store.read(
+            symbol, frequency, start_date or None, end_date or None
+        )
+
     # Exit the program if the user enters an invalid choice
     print_colored("Invalid choice", "error")
     sys.exit(1)
@@ -121,10 +137,14 @@ def model_selection_input():
 
 
 def main():
-    fetcher = DataFetcher()
+    # Fetched series are also written to the OHLCV store for later runs
+    fetcher = DataFetcher(store=OHLCVStore())
 
     # Select data dynamically based on user input
     data = select_data(fetcher)  # example testing defaults , "4", "data/sets/eth.csv"
+    if data is None or data.empty:
+        print_colored("No data was loaded, nothing to train on.", "error")
+        sys.exit(1)
 
     # Normalize and preprocess the data
     data = preprocess_data(data)
@@ -0,0 +1,276 @@
+import copy
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.model_commons import (
+    LAG_FEATURE_COLUMNS,
+    create_lag_matrix,
+    split_and_scale_data,
+)
+
+# Folder of the default store's disk cache, disabled if set to an empty string
+FEATURE_STORE_FOLDER = os.getenv("FEATURE_STORE_FOLDER", "data/features")
+
+
+def _hashable_values(values):
+    """Values of an index or column as a NumPy array with a fixed-width dtype."""
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.array.asi8
+    array = values.to_numpy()
+    if array.dtype.kind in "mM":
+        # Buffers of datetime64 and timedelta64 arrays cannot be hashed directly
+        return array.view("i8")
+    if array.dtype == object:
+        return pd.util.hash_array(array)
+    return array
+
+
+def frame_fingerprint(data: pd.DataFrame, columns=None) -> str:
+    """
+    Hash of the index and the given columns (by default all) of a frame.
+
+    The frame is hashed on every call, so frames changed in place get a new
+    fingerprint.
+    """
+    columns = list(data.columns if columns is None else columns)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str((len(data), tuple(columns))).encode())
+    for values in [data.index] + [data[column] for column in columns]:
+        values = np.ascontiguousarray(_hashable_values(values))
+        digest.update(values.dtype.str.encode())
+        digest.update(memoryview(values).cast("B"))
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """
+    A cache of the features shared by the lag-based models.
+
+    Features are keyed by a fingerprint of the dataset plus the feature spec, so
+    models trained or served on the same data with the same lags reuse one lag
+    matrix instead of each building it. Entries are kept in memory and, for
+    large datasets, on disk as .npy files that are memory-mapped back in. Both
+    caches evict their least recently used entries beyond a size limit.
+
+    Served arrays are read-only and shared between callers.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        cache_folder=None,
+        max_memory_bytes=2**29,
+        max_disk_bytes=2**30,
+        min_disk_rows=10_000,
+    ):
+        """
+        :param cache_folder: Folder of the disk cache, or None to only cache in memory.
+        :param max_memory_bytes: Size limit of the in-memory cache.
+        :param max_disk_bytes: Size limit of the disk cache.
+        :param min_disk_rows: Smaller feature sets are only cached in memory.
+        """
+        self.cache_folder = cache_folder
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.min_disk_rows = min_disk_rows
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        if self.cache_folder:
+            os.makedirs(self.cache_folder, exist_ok=True)
+
+    def fingerprint(self, data: pd.DataFrame, columns) -> str:
+        """Hash of the index and the given columns of a frame, see frame_fingerprint."""
+        return frame_fingerprint(data, columns)
+
+    def _remember(self, key, value):
+        """Keep an entry in memory, evicting the least recently used beyond the limit."""
+        nbytes = sum(array.nbytes for array in value if isinstance(array, np.ndarray))
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = (value, nbytes)
+            self._memory_bytes += nbytes
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, (_, evicted_bytes) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_bytes
+
+    def _recall(self, key):
+        with self._lock:
+            if key not in self._memory:
+                return None
+            self._memory.move_to_end(key)
+            return self._memory[key][0]
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_folder, key)
+
+    def _load_from_disk(self, key):
+        """Memory-map a cached entry from disk, or return None."""
+        if not self.cache_folder:
+            return None
+        path = self._disk_path(key)
+        try:
+            value = tuple(
+                np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                for name in ("features", "target", "positions")
+            )
+        except (OSError, ValueError):
+            return None
+        os.utime(path)
+        return value
+
+    def _save_to_disk(self, key, value):
+        """Write an entry to the disk cache and evict old entries beyond its limit."""
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, array in zip(("features", "target", "positions"), value):
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process cached the same entry first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.evict_disk()
+
+    def evict_disk(self):
+        """Remove least recently used entries until the disk cache fits its limit."""
+        if not self.cache_folder:
+            return
+        entries = []
+        for name in os.listdir(self.cache_folder):
+            path = os.path.join(self.cache_folder, name)
+            if name.endswith(".tmp") or not os.path.isdir(path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, file)) for file in os.listdir(path)
+            )
+            entries.append((os.path.getmtime(path), size, path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_disk_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+    # pylint: disable=too-many-arguments
+    def lag_matrix(
+        self,
+        data: pd.DataFrame,
+        target_col: str,
+        n_lags: int,
+        feature_cols=None,
+        dtype=np.float64,
+    ):
+        """
+        Cached create_lag_matrix(data, target_col, n_lags, feature_cols, dtype).
+
+        :return: Tuple of (features, target, index), see create_lag_matrix.
+        """
+        feature_cols = list(feature_cols or LAG_FEATURE_COLUMNS)
+        spec = json.dumps(
+            [target_col, n_lags, feature_cols, np.dtype(dtype).str], sort_keys=True
+        )
+        fingerprint = self.fingerprint(data, feature_cols + [target_col])
+        key = hashlib.blake2b(
+            f"{fingerprint}{spec}".encode(), digest_size=16
+        ).hexdigest()
+
+        value = self._recall(key)
+        if value is not None:
+            self.stats["hits"] += 1
+        else:
+            value = self._load_from_disk(key)
+            if value is not None:
+                self.stats["disk_hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                # Index by position so the entry can be served for any index
+                features, target, positions = create_lag_matrix(
+                    data.reset_index(drop=True), target_col, n_lags, feature_cols, dtype
+                )
+                value = (features, target, positions.to_numpy(dtype=np.int64))
+                for array in value:
+                    array.flags.writeable = False
+                if self.cache_folder and len(features) >= self.min_disk_rows:
+                    self._save_to_disk(key, value)
+            self._remember(key, value)
+
+        features, target, positions = value
+        return features, target, data.index[positions]
+
+    # pylint: disable=too-many-arguments
+    def split_and_scale(
+        self,
+        data: pd.DataFrame,
+        target_col: str,
+        n_lags: int,
+        scaler=None,
+        test_size=0.2,
+        random_state=42,
+    ):
+        """
+        Cached split_and_scale_data of the lag matrix of data.
+
+        Models that split and scale the same features the same way share one
+        fitted split. Each caller gets its own copy of the fitted scaler.
+
+        :return: Tuple of (x_train_scaled, x_val_scaled, y_train, y_val, scaler).
+        """
+        features, target, _ = self.lag_matrix(data, target_col, n_lags)
+        scaler_spec = (
+            None
+            if scaler is None
+            else (type(scaler).__name__, sorted(scaler.get_params().items()))
+        )
+        key = (
+            "split",
+            self.fingerprint(data, LAG_FEATURE_COLUMNS + [target_col]),
+            target_col,
+            n_lags,
+            repr(scaler_spec),
+            test_size,
+            random_state,
+        )
+
+        value = self._recall(key)
+        if value is None:
+            value = split_and_scale_data(
+                features,
+                target,
+                scaler=scaler,
+                test_size=test_size,
+                random_state=random_state,
+            )
+            for array in value[:4]:
+                array.flags.writeable = False
+            self._remember(key, value)
+        return (*value[:4], copy.deepcopy(value[4]))
+
+    def clear(self):
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+
+_DEFAULT_STORE = None
+_DEFAULT_STORE_LOCK = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    """The feature store shared by all models in this process."""
+    global _DEFAULT_STORE  # pylint: disable=global-statement
+    with _DEFAULT_STORE_LOCK:
+        if _DEFAULT_STORE is None:
+            _DEFAULT_STORE = FeatureStore(cache_folder=FEATURE_STORE_FOLDER or None)
+        return _DEFAULT_STORE
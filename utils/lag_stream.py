@@ -0,0 +1,132 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from utils.model_commons import LAG_FEATURE_COLUMNS
+
+
+class LagStream:
+    """
+    Streaming feature state of a lag-based model for one symbol.
+
+    The last n_lags closes are kept in a ring buffer in which every value is
+    written twice, at position p and p + n_lags, so the lags of the next bar are
+    always one contiguous slice. Each bar fills a preallocated feature row
+    (feature columns, then lag_1 ... lag_n) and scales it in place with the
+    affine transform of the model's fitted MinMaxScaler, so the row matches a
+    row of create_lag_matrix followed by scaler.transform.
+    """
+
+    def __init__(self, n_lags, scaler=None, feature_cols=None):
+        self.n_lags = n_lags
+        self.feature_cols = list(feature_cols or LAG_FEATURE_COLUMNS)
+        self.count = 0
+        self._position = 0
+        self._closes = np.zeros(2 * n_lags, dtype=np.float64)
+        self.row = np.zeros((1, len(self.feature_cols) + n_lags), dtype=np.float64)
+
+        # MinMaxScaler.transform is x * scale_ + min_, optionally clipped
+        self._scale = getattr(scaler, "scale_", None)
+        self._offset = getattr(scaler, "min_", None)
+        self._clip = getattr(scaler, "clip", False) and scaler.feature_range
+
+    @property
+    def ready(self):
+        """Whether enough closes have been seen to fill every lag."""
+        return self.count >= self.n_lags
+
+    def push(self, close):
+        """Add the close of a finished bar."""
+        if self.n_lags:
+            self._closes[self._position] = close
+            self._closes[self._position + self.n_lags] = close
+            self._position = (self._position + 1) % self.n_lags
+        self.count += 1
+
+    def features(self, bar):
+        """
+        Fill the scaled feature row for a bar from its feature columns and the
+        buffered closes.
+
+        :param bar: Mapping with the feature columns of the bar.
+        :return: The (1, n_features + n_lags) feature row, reused between calls.
+        """
+        row = self.row[0]
+        for i, column in enumerate(self.feature_cols):
+            row[i] = bar[column]
+        # Oldest to newest close, reversed into lag_1 ... lag_n
+        start = self._position
+        row[len(self.feature_cols) :] = self._closes[start : start + self.n_lags][::-1]
+        if self._scale is not None:
+            row *= self._scale
+            row += self._offset
+            if self._clip:
+                np.clip(row, self._clip[0], self._clip[1], out=row)
+        return self.row
+
+
+class LagStreamingMixin(ABC):
+    """
+    Streaming inference for models built on create_lag_matrix features.
+
+    Models set n_lags and scaler and implement _predict_row.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Streaming state of each symbol
+        self._lag_streams = {}
+
+    @abstractmethod
+    def _predict_row(self, row) -> float:
+        """Predict from one scaled feature row, a (1, n_features + n_lags) array."""
+
+    def load(self):
+        """Load the model and drop streams scaled with the previous scaler."""
+        loaded = super().load()  # type: ignore
+        self.reset_stream()
+        return loaded
+
+    def reset_stream(self, symbol=None):
+        """Forget the streaming state of a symbol, or of every symbol."""
+        if symbol is None:
+            self._lag_streams.clear()
+        else:
+            self._lag_streams.pop(symbol, None)
+
+    def warm_stream(self, history, symbol="default"):
+        """
+        Start streaming a symbol from its recent history.
+
+        :param history: Frame or mapping whose 'close' holds past closes, oldest first.
+        """
+        stream = LagStream(self.n_lags, scaler=self.scaler)  # type: ignore
+        closes = np.asarray(history["close"], dtype=np.float64)
+        for close in closes[-self.n_lags :] if self.n_lags else []:  # type: ignore
+            stream.push(close)
+        self._lag_streams[symbol] = stream
+        return stream
+
+    def stream_inference(self, bar, symbol="default") -> float:
+        """
+        Predict the close of a new bar, updating the symbol's lags in O(n_lags).
+
+        The prediction only uses the bar's feature columns and earlier closes. If
+        the bar has a 'close', it is pushed as the newest lag afterwards.
+
+        :param bar: Mapping (e.g. dict) with the bar's open, high, low and volume.
+        :return: Predicted close, or NaN until n_lags closes have been seen.
+        """
+        stream = self._lag_streams.get(symbol)
+        if stream is None:
+            stream = self._lag_streams[symbol] = LagStream(
+                self.n_lags, scaler=self.scaler  # type: ignore
+            )
+
+        prediction = (
+            self._predict_row(stream.features(bar)) if stream.ready else float("nan")
+        )
+        close = bar.get("close")
+        if close is not None:
+            stream.push(close)
+        return prediction
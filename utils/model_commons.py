@@ -6,6 +6,9 @@ import torch
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import MinMaxScaler
 
+# Columns placed before the lags in the features of the lag-based models
+LAG_FEATURE_COLUMNS = ["open", "high", "low", "volume"]
+
 
 def set_seed(seed):
     """Set seed for reproducibility across different libraries."""
@@ -30,6 +33,61 @@ def create_lag_features(
     return df.dropna()
 
 
+# pylint: disable=too-many-locals
+def create_lag_matrix(
+    data: pd.DataFrame,
+    target_col: str,
+    n_lags: int,
+    feature_cols=None,
+    dtype=np.float64,
+):
+    """
+    Build the feature matrix of the lag-based models as one contiguous array.
+
+    Row t holds the feature columns at t followed by target[t-1] ... target[t-n_lags],
+    the same values as create_lag_features(data, target_col, n_lags)[feature_cols +
+    lag columns]. The lags are read from a strided sliding_window_view of the
+    target and written straight into the preallocated output, so the only copy
+    is the result itself. Rows with missing values are dropped.
+
+    :param data: Input data with the feature and target columns.
+    :param target_col: Column the lags are taken from.
+    :param n_lags: Number of lags.
+    :param feature_cols: Columns placed before the lags, defaults to open, high,
+        low and volume.
+    :param dtype: Dtype of the feature matrix.
+    :return: Tuple of (features of shape (n, n_features + n_lags), target of
+        shape (n,), index of the rows in data).
+    """
+    if feature_cols is None:
+        feature_cols = LAG_FEATURE_COLUMNS
+    target = data[target_col].to_numpy(dtype=np.float64)
+    rows = max(len(target) - n_lags, 0)
+    n_features = len(feature_cols)
+
+    features = np.empty((rows, n_features + n_lags), dtype=dtype)
+    for i, column in enumerate(feature_cols):
+        features[:, i] = data[column].to_numpy()[n_lags:]
+    if rows and n_lags:
+        # Window i covers target[i .. i + n_lags], so lag k of row i is window[i, -1 - k]
+        windows = np.lib.stride_tricks.sliding_window_view(target, n_lags + 1)
+        features[:, n_features:] = windows[:, n_lags - 1 :: -1]
+    y = target[n_lags:]
+    index = data.index[n_lags:]
+
+    # A row is incomplete if its features, its target or any of its lags are missing
+    missing = np.isnan(target).astype(np.int64)
+    counts = np.concatenate(([0], np.cumsum(missing)))
+    incomplete = counts[n_lags + 1 :] > counts[:rows]
+    for i in range(n_features):
+        incomplete |= np.isnan(features[:, i])
+    if incomplete.any():
+        keep = ~incomplete
+        features, y, index = features[keep], y[keep], index[keep]
+
+    return features, y, index
+
+
 def split_and_scale_data(features, target, scaler=None, test_size=0.2, random_state=42):
     """
     Split the data and scale the features. Uses the provided scaler if available,
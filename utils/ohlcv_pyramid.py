@@ -0,0 +1,221 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from utils.feature_store import frame_fingerprint
+
+# Resolutions precomputed by the pyramid, each aggregated from the previous one
+PYRAMID_LEVELS = ["1min", "5min", "1h", "4h", "1D"]
+
+# Aggregation of each OHLCV column when bars are combined into coarser bars
+OHLCV_AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+}
+
+
+def _fixed_nanos(offset):
+    """Length of a fixed frequency in nanoseconds, or None for calendar frequencies."""
+    try:
+        return offset.nanos
+    except ValueError:
+        return None
+
+
+class OHLCVPyramid:
+    """
+    Precomputed OHLCV aggregates of one series at several resolutions.
+
+    Each level of PYRAMID_LEVELS that is not finer than the raw bars is aggregated
+    from the previous level, with proper OHLC aggregation (first open, highest
+    high, lowest low, last close, summed volume; other columns keep their last
+    value). Levels are built on first use and kept, so any interval is served
+    by resampling the coarsest level that evenly divides it rather than the raw
+    bars. New bars are added with update(), which only recomputes the last bar of
+    every level.
+    """
+
+    def __init__(self, data: pd.DataFrame, levels=None):
+        """
+        :param data: Bars with a 'date' column or a DatetimeIndex.
+        :param levels: Resolutions to precompute, from fine to coarse.
+        """
+        self.raw = self._prepare(data)
+        self.levels = {}
+        self._offsets = {
+            level: to_offset(level) for level in (levels or PYRAMID_LEVELS)
+        }
+        self._resampled = {}
+        # Levels whose bars are the raw bars themselves
+        self._raw_levels = set()
+
+        # Only levels that are not finer than the raw bars can be built
+        steps = self.raw.index.to_series().diff().dropna()
+        self.raw_step = steps.median() if not steps.empty else None
+
+    @staticmethod
+    def _prepare(data):
+        """Index bars by date, sorted, without copying their columns."""
+        if "date" in data.columns:
+            frame = data.set_index(pd.to_datetime(data["date"])).drop(columns="date")
+        elif isinstance(data.index, pd.DatetimeIndex):
+            frame = data.copy(deep=False)
+        else:
+            raise ValueError("Data must have a 'date' column or a DatetimeIndex.")
+        frame.index.name = "date"
+        if not frame.index.is_monotonic_increasing:
+            frame = frame.sort_index(kind="stable")
+        return frame
+
+    @staticmethod
+    def _aggregate(frame, interval):
+        """Combine bars into bars of the given interval, dropping empty bins."""
+        aggregations = {
+            column: OHLCV_AGGREGATIONS.get(column, "last") for column in frame.columns
+        }
+        resampled = frame.resample(interval).agg(aggregations)
+        subset = ["close"] if "close" in resampled.columns else None
+        return resampled.dropna(subset=subset, how="all")
+
+    def _is_aligned(self, interval):
+        """Whether the raw bars are already bars of the given interval."""
+        offset = self._offsets[interval]
+        return (
+            self.raw_step is not None
+            and self.raw_step == pd.Timedelta(offset.nanos)
+            and (self.raw.index == self.raw.index.floor(offset)).all()
+        )
+
+    def _usable_levels(self):
+        """Levels that are not finer than the raw bars, from fine to coarse."""
+        if self.raw_step is None:
+            return []
+        return [
+            level
+            for level, offset in self._offsets.items()
+            if pd.Timedelta(offset.nanos) >= self.raw_step
+        ]
+
+    def level(self, interval) -> pd.DataFrame:
+        """The bars of a pyramid level, building it and the levels below if needed."""
+        if interval not in self.levels:
+            source = self.raw
+            for name in self._usable_levels():
+                if name not in self.levels:
+                    if source is self.raw and self._is_aligned(name):
+                        self.levels[name] = self.raw
+                        self._raw_levels.add(name)
+                    else:
+                        self.levels[name] = self._aggregate(source, name)
+                source = self.levels[name]
+                if name == interval:
+                    break
+            if interval not in self.levels:
+                raise ValueError(f"{interval} is not a level of this pyramid.")
+        return self.levels[interval]
+
+    def _source_level(self, interval):
+        """The coarsest level that bars of the given interval can be built from."""
+        nanos = _fixed_nanos(to_offset(interval))
+        source = None
+        for name in self._usable_levels():
+            level_nanos = self._offsets[name].nanos
+            # Calendar intervals (weeks, months) are built from whole days
+            if (nanos is None and level_nanos <= pd.Timedelta(days=1).value) or (
+                nanos is not None and nanos % level_nanos == 0
+            ):
+                source = name
+        return source
+
+    def resample(self, interval) -> pd.DataFrame:
+        """
+        Bars of any pandas interval, read from the nearest precomputed level.
+
+        :param interval: Pandas frequency string such as '5min', 'h', 'D' or 'W'.
+        :return: Frame indexed by 'date' with the aggregated bars.
+        """
+        source = self._source_level(interval)
+        if source is None:
+            # Finer or irregular intervals are aggregated from the raw bars
+            source_bars = self.raw
+        elif to_offset(interval) == self._offsets[source]:
+            return self.level(source)
+        else:
+            source_bars = self.level(source)
+        if interval not in self._resampled:
+            self._resampled[interval] = self._aggregate(source_bars, interval)
+        return self._resampled[interval]
+
+    def update(self, new_bars: pd.DataFrame):
+        """
+        Add new bars, replacing raw bars at or after the first new date, and
+        recompute the bars of every built level from the bin of the first new bar.
+        """
+        new = self._prepare(new_bars)
+        if new.empty:
+            return
+        first = new.index[0]
+        self.raw = pd.concat([self.raw.iloc[: self.raw.index.searchsorted(first)], new])
+        if self.raw_step is None:
+            steps = self.raw.index.to_series().diff().dropna()
+            self.raw_step = steps.median() if not steps.empty else None
+        self._resampled = {}
+
+        source = self.raw
+        for name in self._usable_levels():
+            if name not in self.levels:
+                break
+            offset = self._offsets[name]
+            if (
+                name in self._raw_levels
+                and (new.index == new.index.floor(offset)).all()
+            ):
+                self.levels[name] = self.raw
+            else:
+                self._raw_levels.discard(name)
+                cutoff = first.floor(offset)
+                bars = self.levels[name]
+                self.levels[name] = pd.concat(
+                    [
+                        bars.iloc[: bars.index.searchsorted(cutoff)],
+                        self._aggregate(
+                            source.iloc[source.index.searchsorted(cutoff) :], name
+                        ),
+                    ]
+                )
+            source = self.levels[name]
+
+
+# Pyramids of the most recently used frames, keyed by a fingerprint of their bars
+MAX_CACHED_PYRAMIDS = 8
+_PYRAMIDS = OrderedDict()
+_PYRAMIDS_LOCK = threading.Lock()
+
+
+def get_pyramid(data: pd.DataFrame) -> OHLCVPyramid:
+    """
+    The pyramid of a frame, shared by every call with the same bars.
+
+    Pyramids are keyed by a fingerprint of the frame's index and columns, so
+    models calling this on the same data share one pyramid and the raw bars are
+    aggregated once however many models and intervals use them. A frame changed
+    in place gets a new fingerprint and thus a new pyramid. The least recently
+    used pyramids beyond MAX_CACHED_PYRAMIDS are dropped.
+    """
+    key = frame_fingerprint(data)
+    with _PYRAMIDS_LOCK:
+        pyramid = _PYRAMIDS.get(key)
+        if pyramid is not None:
+            _PYRAMIDS.move_to_end(key)
+            return pyramid
+    pyramid = OHLCVPyramid(data)
+    with _PYRAMIDS_LOCK:
+        _PYRAMIDS[key] = pyramid
+        while len(_PYRAMIDS) > MAX_CACHED_PYRAMIDS:
+            _PYRAMIDS.popitem(last=False)
+    return pyramid
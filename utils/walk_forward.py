@@ -0,0 +1,310 @@
+import inspect
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import torch
+
+from models.model_factory import ModelFactory
+from utils.common import print_colored
+
+
+def walk_forward_folds(n_rows, n_folds=5, test_size=None, window=None, gap=0):
+    """
+    Row bounds of walk-forward folds, oldest first.
+
+    Every fold is tested on the test_size rows that follow its training rows, so
+    no fold is trained on data from after its test period. By default the
+    training window expands to all earlier rows (like sklearn's TimeSeriesSplit);
+    with a window it rolls, keeping only the last window rows.
+
+    :param n_rows: Number of rows in the data.
+    :param n_folds: Number of folds.
+    :param test_size: Rows per test period, defaults to n_rows // (n_folds + 1).
+    :param window: Training rows of a rolling window, or None for an expanding one.
+    :param gap: Rows skipped between the training and test rows of a fold.
+    :return: List of (train_start, train_end, test_start, test_end), ends exclusive.
+    """
+    if test_size is None:
+        test_size = n_rows // (n_folds + 1)
+    first_test = n_rows - n_folds * test_size
+    if test_size <= 0 or first_test - gap <= 0:
+        raise ValueError(
+            f"Cannot make {n_folds} folds of {test_size} test rows from {n_rows} rows."
+        )
+
+    folds = []
+    for fold in range(n_folds):
+        test_start = first_test + fold * test_size
+        train_end = test_start - gap
+        train_start = 0 if window is None else max(train_end - window, 0)
+        folds.append((train_start, train_end, test_start, test_start + test_size))
+    return folds
+
+
+def _align_predictions(predictions, frame):
+    """
+    Predictions of a model as an array with one value per row of frame.
+
+    Models label predictions by date, by the index of the input or only by
+    position, so predictions with a 'date' column are matched to the latest date
+    at or before each row, predictions on the input index are matched by index,
+    and any others are aligned with the last rows of frame.
+    """
+    if isinstance(predictions, pd.Series):
+        predictions = predictions.to_frame("prediction")
+    values = pd.to_numeric(predictions["prediction"], errors="coerce")
+
+    if "date" in predictions.columns and "date" in frame.columns:
+        dates = pd.to_datetime(predictions["date"], utc=True)
+        by_date = pd.Series(values.to_numpy(), index=dates).sort_index()
+        by_date = by_date[~by_date.index.duplicated(keep="last")]
+        rows = pd.to_datetime(frame["date"], utc=True)
+        return by_date.reindex(rows, method="ffill").to_numpy(dtype=np.float64)
+    if predictions.index.equals(frame.index):
+        return values.to_numpy(dtype=np.float64)
+
+    aligned = np.full(len(frame), np.nan)
+    count = min(len(values), len(frame))
+    if count:
+        aligned[-count:] = values.to_numpy(dtype=np.float64)[-count:]
+    return aligned
+
+
+def fold_metrics(actual, predicted, previous):
+    """
+    Error metrics of the predictions of one fold.
+
+    :param actual: Actual closes of the test rows.
+    :param predicted: Predicted closes, NaN where the model made no prediction.
+    :param previous: Actual closes of the rows before the test rows.
+    :return: Dictionary of the metrics and the number of rows scored.
+    """
+    scored = ~np.isnan(predicted) & ~np.isnan(actual)
+    actual, predicted, previous = actual[scored], predicted[scored], previous[scored]
+    if not len(actual):
+        return {"rows": 0, "mae": np.nan, "rmse": np.nan, "mape": np.nan, "hit": np.nan}
+
+    errors = predicted - actual
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mape = np.nanmean(np.abs(errors / actual)) * 100
+    return {
+        "rows": int(len(actual)),
+        "mae": float(np.mean(np.abs(errors))),
+        "rmse": float(np.sqrt(np.mean(errors**2))),
+        "mape": float(mape),
+        # Share of rows where the predicted move from the previous close has the
+        # same sign as the actual move
+        "hit": float(
+            np.mean(np.sign(predicted - previous) == np.sign(actual - previous))
+        ),
+    }
+
+
+_FOLD_DATA = None
+
+
+def _init_worker(data, threads):
+    """Keep the data in the worker so it is sent once instead of once per fold."""
+    global _FOLD_DATA  # pylint: disable=global-statement
+    _FOLD_DATA = data
+    torch.set_num_threads(threads)
+
+
+def _context_rows(model, train_rows):
+    """Rows before the test rows a model needs to predict the first test row."""
+    n_lags = getattr(model, "n_lags", None)
+    # Models without lag features are given their whole training window
+    return train_rows if n_lags is None else min(n_lags, train_rows)
+
+
+def _one_step_predictions(model, test_data):
+    """
+    Predictions of a model on test_data, each made from the actual rows before it.
+
+    Models with a teacher-forced mode (the LSTM) are run in it, since their
+    default inference forecasts recursively from the last window of the input,
+    which already holds the test rows. Their input is scaled with the scaler
+    fitted in training, since one fitted on the input would see the test rows.
+    """
+    parameters = inspect.signature(model.inference).parameters
+    if "teacher_forcing" not in parameters:
+        return model.inference(test_data)
+    if "refit_scaler" in parameters:
+        return model.inference(test_data, teacher_forcing=True, refit_scaler=False)
+    return model.inference(test_data, teacher_forcing=True)
+
+
+# pylint: disable=too-many-locals
+def _run_fold(model_names, fold, bounds):
+    """Train and score every model on one fold of the worker's data."""
+    data = _FOLD_DATA
+    train_start, train_end, test_start, test_end = bounds
+    train_data = data.iloc[train_start:train_end]
+    close = data["close"].to_numpy(dtype=np.float64)
+    factory = ModelFactory()
+
+    results = []
+    for model_name in model_names:
+        row = {"model": model_name, "fold": fold}
+        # Keep fold models out of the trained models folder
+        save_dir = tempfile.mkdtemp(prefix=f"walk_forward_{fold}_")
+        try:
+            # Models whose dependencies are missing fail here, like any other fold
+            model = factory.create_model(model_name)
+            model.save_dir = save_dir
+            start = time.perf_counter()
+            model.train(train_data)
+            row["train_seconds"] = time.perf_counter() - start
+
+            context = _context_rows(model, train_end - train_start)
+            test_data = data.iloc[test_start - context : test_end]
+            start = time.perf_counter()
+            predictions = _one_step_predictions(model, test_data)
+            row["inference_seconds"] = time.perf_counter() - start
+
+            predicted = _align_predictions(predictions, test_data)[
+                -(test_end - test_start) :
+            ]
+            row.update(
+                fold_metrics(
+                    close[test_start:test_end],
+                    predicted,
+                    close[test_start - 1 : test_end - 1],
+                )
+            )
+        # pylint: disable=broad-except
+        except Exception as e:
+            row["error"] = str(e)
+        finally:
+            shutil.rmtree(save_dir, ignore_errors=True)
+        results.append(row)
+    return results
+
+
+class WalkForwardValidator:
+    """
+    Walk-forward evaluation of models on the folds of walk_forward_folds.
+
+    Every fold is a task of a process pool, in which each model is trained on the
+    fold's training rows and scored on its test rows. The data is sent to each
+    worker once. Models of one fold run in the same worker, so the lag-based
+    models share the fold's lag features and fitted scaler through the feature
+    store, and with a disk cache (see FEATURE_STORE_FOLDER) repeated backtests
+    of the same data reuse them too. With enough workers a backtest takes about as
+    long as its slowest fold.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, n_folds=5, test_size=None, window=None, gap=0, max_workers=None):
+        """
+        :param n_folds: Number of folds.
+        :param test_size: Rows per test period, defaults to n_rows // (n_folds + 1).
+        :param window: Training rows of a rolling window, or None for an expanding one.
+        :param gap: Rows skipped between the training and test rows of a fold.
+        :param max_workers: Worker processes, defaults to one per fold up to the
+            number of CPUs. With 1, folds run in this process.
+        """
+        self.n_folds = n_folds
+        self.test_size = test_size
+        self.window = window
+        self.gap = gap
+        self.max_workers = max_workers
+
+    def folds(self, data: pd.DataFrame):
+        """Row bounds of the folds of data, see walk_forward_folds."""
+        return walk_forward_folds(
+            len(data), self.n_folds, self.test_size, self.window, self.gap
+        )
+
+    def run(self, data: pd.DataFrame, model_names) -> pd.DataFrame:
+        """
+        Backtest models on the folds of data.
+
+        :param data: Preprocessed OHLCV data, oldest first.
+        :param model_names: Names of the models to evaluate, as in configs.models.
+        :return: Frame with one row per model and fold holding the fold bounds,
+            the error metrics (mae, rmse, mape, directional hit rate), the train
+            and inference seconds and the error of folds that failed.
+        """
+        if isinstance(model_names, str):
+            model_names = [model_names]
+        folds = self.folds(data)
+        data = data.reset_index(drop=True)
+        workers = self.max_workers or min(len(folds), os.cpu_count() or 1)
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+        start = time.perf_counter()
+        if workers == 1:
+            _init_worker(data, torch.get_num_threads())
+            fold_results = [
+                _run_fold(model_names, fold, bounds)
+                for fold, bounds in enumerate(folds)
+            ]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(data, threads)
+            ) as executor:
+                # Later folds train on more rows, so they are started first
+                futures = {
+                    fold: executor.submit(_run_fold, model_names, fold, folds[fold])
+                    for fold in reversed(range(len(folds)))
+                }
+                fold_results = [futures[fold].result() for fold in range(len(folds))]
+        elapsed = time.perf_counter() - start
+
+        labels = data["date"] if "date" in data.columns else data.index.to_series()
+        rows = []
+        for bounds, results in zip(folds, fold_results):
+            train_start, train_end, test_start, test_end = bounds
+            for row in results:
+                row.update(
+                    train_start=labels.iloc[train_start],
+                    train_end=labels.iloc[train_end - 1],
+                    test_start=labels.iloc[test_start],
+                    test_end=labels.iloc[test_end - 1],
+                )
+                if "error" in row:
+                    print_colored(
+                        f"{row['model']} failed on fold {row['fold']}: {row['error']}",
+                        "error",
+                    )
+                rows.append(row)
+
+        columns = [
+            "model",
+            "fold",
+            "train_start",
+            "train_end",
+            "test_start",
+            "test_end",
+        ]
+        results = pd.DataFrame(rows)
+        results = results[
+            columns + [column for column in results.columns if column not in columns]
+        ]
+        results.attrs["elapsed_seconds"] = elapsed
+        return results
+
+    @staticmethod
+    def summary(results: pd.DataFrame) -> pd.DataFrame:
+        """Mean metrics and total seconds of each model over its successful folds."""
+        metrics = [
+            column
+            for column in ("mae", "rmse", "mape", "hit")
+            if column in results.columns
+        ]
+        models = results["model"].unique()
+        if "error" in results.columns:
+            results = results[results["error"].isna()]
+        grouped = results.groupby("model", sort=False)
+        summary = grouped[metrics].mean().reindex(models)
+        for column in ("train_seconds", "inference_seconds"):
+            if column in results.columns:
+                summary[column] = grouped[column].sum().reindex(models)
+        summary["folds"] = grouped["fold"].count().reindex(models, fill_value=0)
+        return summary